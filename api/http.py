@@ -0,0 +1,86 @@
+import json
+from functools import wraps
+
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+
+MAX_BATCH_IDS = 100
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors
+
+
+def api_view(methods):
+    """
+    Decorator for JSON API views.
+    Answers with JSON errors instead of redirects or HTML pages: 401 for anonymous
+    users, 405 for other methods, and 403/404/400 for PermissionDenied, Http404
+    and ApiError raised by the view (or by decorators inside this one).
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return JsonResponse({'error': 'Authentication required.'}, status=401)
+            if request.method not in methods:
+                response = JsonResponse({'error': 'Method not allowed.'}, status=405)
+                response['Allow'] = ', '.join(methods)
+                return response
+            try:
+                return view_func(request, *args, **kwargs)
+            except ApiError as e:
+                data = {'error': str(e)}
+                if e.errors:
+                    data['errors'] = e.errors
+                return JsonResponse(data, status=e.status)
+            except PermissionDenied:
+                return JsonResponse({'error': 'You do not have permission to do this.'}, status=403)
+            except Http404:
+                return JsonResponse({'error': 'Not found.'}, status=404)
+        return _wrapped_view
+    return decorator
+
+
+def json_body(request):
+    """
+    Returns the request body parsed as a JSON object.
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError('Request body is not valid JSON.')
+    if not isinstance(data, dict):
+        raise ApiError('Request body must be a JSON object.')
+    return data
+
+
+def form_errors(form):
+    return ApiError('Invalid data.', errors=form.errors.get_json_data())
+
+
+def requested_ids(request):
+    """
+    Returns the ids from ?ids=1,2,3 as a list of ints, or None when not given.
+    """
+    raw = request.GET.get('ids')
+    if raw is None:
+        return None
+    try:
+        ids = [int(value) for value in raw.split(',') if value]
+    except ValueError:
+        raise ApiError('ids must be a comma-separated list of integers.')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ApiError(f'At most {MAX_BATCH_IDS} ids can be fetched at once.')
+    return ids
+
+
+def page_size(request, default=50, maximum=200):
+    try:
+        size = int(request.GET.get('limit', default))
+    except ValueError:
+        raise ApiError('limit must be an integer.')
+    return max(1, min(size, maximum))
@@ -0,0 +1,138 @@
+from core.pagination import InvalidCursor, keyset_paginate
+from task.models import Task
+from .http import ApiError, page_size, requested_ids
+
+
+class Resource:
+    """
+    Describes how a model is exposed: public field names mapped to the lookups
+    passed to values(), plus the keyset ordering used for pagination.
+    Rows are read with values() and renamed, so no model instances are built.
+    """
+
+    def __init__(self, fields, ordering):
+        self.fields = fields
+        self.ordering = ordering
+
+    def parse_fields(self, request):
+        """
+        Returns the public field names selected with ?fields=a,b,c (all by default).
+        """
+        raw = request.GET.get('fields')
+        if not raw:
+            return list(self.fields)
+        names = [name for name in raw.split(',') if name]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}.")
+        return names
+
+    def lookups(self, names):
+        return [self.fields[name] for name in names if self.fields[name] is not None]
+
+    def serialize(self, rows, names):
+        # Fields mapped to None are computed by subclasses.
+        pairs = [(name, self.fields[name]) for name in names if self.fields[name] is not None]
+        return [{name: row[lookup] for name, lookup in pairs} for row in rows]
+
+    def fetch(self, queryset, names):
+        """
+        Returns the selected fields of every row in `queryset` as a list of dicts.
+        """
+        rows = list(queryset.values(*set(self.lookups(names))))
+        return self.serialize(rows, names)
+
+    def get(self, queryset, pk, names):
+        rows = self.fetch(queryset.filter(pk=pk), names)
+        if not rows:
+            raise ApiError('Not found.', status=404)
+        return rows[0]
+
+    def list(self, request, queryset):
+        """
+        Returns the response data for a collection: a batch of rows with ?ids=,
+        otherwise one keyset-paginated page following ?cursor=.
+        """
+        names = self.parse_fields(request)
+        ids = requested_ids(request)
+        if ids is not None:
+            return {'results': self.fetch(queryset.filter(pk__in=ids).order_by(*self.ordering), names)}
+
+        sort_fields = [field.lstrip('-') for field in self.ordering]
+        try:
+            rows, next_cursor = keyset_paginate(
+                queryset.values(*set(self.lookups(names)) | set(sort_fields)),
+                self.ordering, cursor=request.GET.get('cursor'), page_size=page_size(request)
+            )
+        except InvalidCursor as e:
+            raise ApiError(str(e))
+        return {'results': self.serialize(rows, names), 'next_cursor': next_cursor}
+
+
+class TaskResource(Resource):
+    """
+    Tasks expose their assignees as a list of user ids, loaded for a whole page
+    with one query on the through table.
+    """
+
+    def serialize(self, rows, names):
+        results = super().serialize(rows, names)
+        if 'assigned_to' in names:
+            assignees = {}
+            for task_id, user_id in Task.assigned_to.through.objects.filter(
+                task_id__in=[row['id'] for row in rows]
+            ).order_by('user_id').values_list('task_id', 'user_id'):
+                assignees.setdefault(task_id, []).append(user_id)
+            for row, result in zip(rows, results):
+                result['assigned_to'] = assignees.get(row['id'], [])
+        return results
+
+    def lookups(self, names):
+        lookups = super().lookups(names)
+        # The task id is needed to attach assignees even if it was not requested.
+        return lookups + ['id'] if 'assigned_to' in names else lookups
+
+
+PROJECTS = Resource({
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'created_by': 'created_by_id',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'version': 'version',
+}, ordering=['-updated_at', '-id'])
+
+MEMBERS = Resource({
+    'id': 'id',
+    'project': 'project_id',
+    'user': 'user_id',
+    'email': 'user__email',
+    'first_name': 'user__first_name',
+    'last_name': 'user__last_name',
+    'role': 'role',
+    'added_at': 'added_at',
+}, ordering=['id'])
+
+INVITATIONS = Resource({
+    'id': 'id',
+    'project': 'project_id',
+    'user': 'user_id',
+    'email': 'email',
+    'status': 'status',
+    'sent_at': 'sent_at',
+    'accepted_at': 'accepted_at',
+    'invited_by': 'invited_by_id',
+}, ordering=['-sent_at', '-id'])
+
+TASKS = TaskResource({
+    'id': 'id',
+    'project': 'project_id',
+    'title': 'title',
+    'description': 'description',
+    'status': 'status',
+    'created_by': 'created_by_id',
+    'assigned_to': None,
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}, ordering=['-created_at', '-id'])
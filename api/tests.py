@@ -0,0 +1,148 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from mailer.models import OutgoingEmail
+from project.models import Project, ProjectMember, ProjectInvitation
+from task.models import Task
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.member = User.objects.create_user(
+            'member@example.com', 'password', first_name='Mark', last_name='Member', is_active=True
+        )
+        cls.outsider = User.objects.create_user(
+            'outsider@example.com', 'password', first_name='Otto', last_name='Outsider', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='Moon landing', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+        ProjectMember.objects.create(project=cls.project, user=cls.member, role='contributor')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
+
+    def add_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(project=self.project, title=f'Task {i}', description='', created_by=self.owner)
+            task.assigned_to.add(self.member)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('api:project_collection'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_non_member_is_forbidden(self):
+        self.client.force_login(self.outsider)
+        response = self.client.get(reverse('api:task_collection', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(reverse('api:project_collection')).json()['results'], [])
+
+    def test_sparse_fields(self):
+        response = self.client.get(reverse('api:project_collection'), {'fields': 'id,name'})
+        self.assertEqual(response.json()['results'], [{'id': self.project.pk, 'name': 'Apollo'}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('api:project_collection'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination(self):
+        self.add_tasks(5)
+        url = reverse('api:task_collection', args=[self.project.pk])
+        titles = []
+        cursor = ''
+        while True:
+            data = self.client.get(url, {'fields': 'title', 'limit': 2, 'cursor': cursor}).json()
+            titles += [task['title'] for task in data['results']]
+            if not data['next_cursor']:
+                break
+            cursor = data['next_cursor']
+        self.assertEqual(titles, [f'Task {i}' for i in reversed(range(5))])
+
+    def test_task_list_does_not_grow_with_tasks(self):
+        self.add_tasks(30)
+        url = reverse('api:task_collection', args=[self.project.pk])
+        # session, user, roles, tasks page, assignees
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['results']), 30)
+        self.assertEqual(response.json()['results'][0]['assigned_to'], [self.member.pk])
+
+    def test_batch_get_by_ids(self):
+        self.add_tasks(3)
+        ids = list(Task.objects.order_by('id').values_list('id', flat=True))
+        response = self.client.get(
+            reverse('api:task_collection', args=[self.project.pk]),
+            {'ids': f'{ids[0]},{ids[2]}', 'fields': 'id'},
+        )
+        self.assertEqual(response.json(), {'results': [{'id': ids[2]}, {'id': ids[0]}]})
+
+    def test_create_and_update_project(self):
+        response = self.send('post', reverse('api:project_collection'), {'name': 'Gemini', 'description': 'Orbit'})
+        self.assertEqual(response.status_code, 201)
+        project_id = response.json()['id']
+        self.assertTrue(ProjectMember.objects.filter(project_id=project_id, user=self.owner, role='creator').exists())
+
+        response = self.send('patch', reverse('api:project_item', args=[project_id]), {'name': 'Gemini 2'})
+        self.assertEqual(response.json()['name'], 'Gemini 2')
+        self.assertEqual(response.json()['description'], 'Orbit')
+
+    def test_invalid_payload_reports_field_errors(self):
+        response = self.send('post', reverse('api:project_collection'), {'description': 'No name'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json()['errors'])
+
+    def test_contributor_cannot_write(self):
+        self.client.force_login(self.member)
+        response = self.send('patch', reverse('api:project_item', args=[self.project.pk]), {'name': 'Mine'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_create_and_update_task(self):
+        response = self.send('post', reverse('api:task_collection', args=[self.project.pk]), {
+            'title': 'Launch', 'description': 'Lift off', 'status': 'todo', 'assigned_to': [self.member.pk],
+        })
+        self.assertEqual(response.status_code, 201)
+        task_id = response.json()['id']
+        self.assertEqual(response.json()['assigned_to'], [self.member.pk])
+
+        response = self.send('patch', reverse('api:task_item', args=[task_id]), {'status': 'done'})
+        self.assertEqual(response.json()['status'], 'done')
+        self.assertEqual(response.json()['assigned_to'], [self.member.pk])
+
+        response = self.client.delete(reverse('api:task_item', args=[task_id]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Task.objects.filter(pk=task_id).exists())
+
+    def test_members(self):
+        url = reverse('api:member_collection', args=[self.project.pk])
+        response = self.send('post', url, {'email': 'outsider@example.com', 'role': 'contributor'})
+        self.assertEqual(response.status_code, 201)
+        emails = [member['email'] for member in self.client.get(url, {'fields': 'email'}).json()['results']]
+        self.assertEqual(emails, ['owner@example.com', 'member@example.com', 'outsider@example.com'])
+
+        response = self.client.delete(reverse('api:member_item', args=[response.json()['id']]))
+        self.assertEqual(response.status_code, 204)
+
+    def test_invitations(self):
+        url = reverse('api:invitation_collection', args=[self.project.pk])
+        response = self.send('post', url, {'emails': ['new@example.com', 'member@example.com']})
+        self.assertEqual(
+            [result['status'] for result in response.json()['results']], ['invited', 'member']
+        )
+        self.assertTrue(ProjectInvitation.objects.filter(email='new@example.com').exists())
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+        self.assertEqual(self.client.get(url, {'fields': 'email'}).json()['results'], [{'email': 'new@example.com'}])
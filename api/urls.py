@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('projects/', views.project_collection, name='project_collection'),
+    path('projects/<int:pk>/', views.project_item, name='project_item'),
+    path('projects/<int:pk>/members/', views.member_collection, name='member_collection'),
+    path('projects/<int:pk>/invitations/', views.invitation_collection, name='invitation_collection'),
+    path('projects/<int:pk>/tasks/', views.task_collection, name='task_collection'),
+    path('members/<int:member_id>/', views.member_item, name='member_item'),
+    path('tasks/<int:task_id>/', views.task_item, name='task_item'),
+]
@@ -0,0 +1,193 @@
+from django.db import transaction
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from project.forms import AddMemberByEmailForm, BulkInviteForm, ProjectForm
+from project.models import Project, ProjectMember, ProjectInvitation
+from project.permissions import get_project_role, get_project_roles, project_access_required
+from project.services import bulk_invite
+from task.forms import TaskForm
+from task.models import Task
+from users.models import User
+from .http import ApiError, api_view, form_errors, json_body
+from .resources import INVITATIONS, MEMBERS, PROJECTS, TASKS
+
+
+def _require_role(user, project_id, role=None):
+    user_role = get_project_role(user, project_id)
+    if user_role is None or (role is not None and user_role != role):
+        raise ApiError('You do not have permission to do this.', status=403)
+
+
+def _detail(resource, request, queryset, pk, status=200):
+    return JsonResponse(resource.get(queryset, pk, resource.parse_fields(request)), status=status)
+
+
+@api_view(['GET', 'POST'])
+def project_collection(request):
+    """
+    GET lists the user's projects; POST creates a project owned by the user.
+    """
+    if request.method == 'POST':
+        form = ProjectForm(json_body(request))
+        if not form.is_valid():
+            raise form_errors(form)
+        with transaction.atomic():
+            project = form.save(commit=False)
+            project.created_by = request.user
+            project.save()
+            ProjectMember.objects.create(project=project, user=request.user, role='creator')
+        return _detail(PROJECTS, request, Project.objects, project.pk, status=201)
+
+    # Membership comes from the cached role map, so no join is needed.
+    projects = Project.objects.filter(pk__in=list(get_project_roles(request.user)))
+    return JsonResponse(PROJECTS.list(request, projects))
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@project_access_required()
+def project_item(request, pk):
+    """
+    GET returns one project; PATCH and DELETE are for the project creator.
+    """
+    if request.method == 'GET':
+        return _detail(PROJECTS, request, Project.objects, pk)
+
+    _require_role(request.user, pk, 'creator')
+    project = get_object_or_404(Project, pk=pk)
+    if request.method == 'DELETE':
+        project.delete()
+        return HttpResponse(status=204)
+
+    form = ProjectForm({**model_to_dict(project, ProjectForm.Meta.fields), **json_body(request)}, instance=project)
+    if not form.is_valid():
+        raise form_errors(form)
+    form.save()
+    return _detail(PROJECTS, request, Project.objects, pk)
+
+
+@api_view(['GET', 'POST'])
+@project_access_required()
+def member_collection(request, pk):
+    """
+    GET lists the project's members; POST adds an existing user by email (creator only).
+    """
+    members = ProjectMember.objects.filter(project_id=pk)
+    if request.method == 'GET':
+        return JsonResponse(MEMBERS.list(request, members))
+
+    _require_role(request.user, pk, 'creator')
+    form = AddMemberByEmailForm(json_body(request))
+    form.project = get_object_or_404(Project, pk=pk)
+    if not form.is_valid():
+        raise form_errors(form)
+    member = ProjectMember.objects.create(
+        project=form.project,
+        user=User.objects.get(email=form.cleaned_data['email']),
+        role=form.cleaned_data['role'],
+    )
+    return _detail(MEMBERS, request, members, member.pk, status=201)
+
+
+@api_view(['DELETE'])
+def member_item(request, member_id):
+    """
+    Removes a member from a project. Only the creator can, and not themselves.
+    """
+    member = get_object_or_404(ProjectMember, pk=member_id)
+    _require_role(request.user, member.project_id, 'creator')
+    if member.user_id == request.user.pk:
+        raise ApiError('The project creator cannot be removed.', status=403)
+    member.delete()
+    return HttpResponse(status=204)
+
+
+@api_view(['GET', 'POST'])
+@project_access_required()
+def invitation_collection(request, pk):
+    """
+    GET lists the project's invitations; POST invites {"emails": [...]} (creator only)
+    and returns one status per address.
+    """
+    if request.method == 'GET':
+        return JsonResponse(INVITATIONS.list(request, ProjectInvitation.objects.filter(project_id=pk)))
+
+    _require_role(request.user, pk, 'creator')
+    emails = json_body(request).get('emails')
+    if not isinstance(emails, list) or not all(isinstance(email, str) for email in emails):
+        raise ApiError('emails must be a list of strings.')
+    if len(emails) > BulkInviteForm.MAX_EMAILS:
+        raise ApiError(f'At most {BulkInviteForm.MAX_EMAILS} addresses can be invited at once.')
+
+    project = get_object_or_404(Project, pk=pk)
+    with transaction.atomic():
+        results = bulk_invite(
+            project, emails, request.user,
+            lambda invitation: request.build_absolute_uri(
+                reverse('project:accept_project_invite', args=[invitation.token])
+            ),
+        )
+    return JsonResponse({
+        'results': [
+            {'email': email, 'status': status, 'message': message}
+            for email, status, message in results
+        ],
+    })
+
+
+@api_view(['GET', 'POST'])
+@project_access_required()
+def task_collection(request, pk):
+    """
+    GET lists the project's tasks, optionally filtered with ?status=;
+    POST creates a task (creator only).
+    """
+    tasks = Task.objects.filter(project_id=pk)
+    if request.method == 'GET':
+        status = request.GET.get('status')
+        if status:
+            tasks = tasks.filter(status=status)
+        return JsonResponse(TASKS.list(request, tasks))
+
+    _require_role(request.user, pk, 'creator')
+    project = get_object_or_404(Project, pk=pk)
+    form = TaskForm(json_body(request), project=project)
+    if not form.is_valid():
+        raise form_errors(form)
+    task = form.save(commit=False)
+    task.project = project
+    task.created_by = request.user
+    task.save()
+    form.save_m2m()
+    return _detail(TASKS, request, tasks, task.pk, status=201)
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+def task_item(request, task_id):
+    """
+    GET returns one task to project members; PATCH and DELETE are for the project creator.
+    """
+    project_id = Task.objects.filter(pk=task_id).values_list('project_id', flat=True).first()
+    if project_id is None:
+        raise ApiError('Not found.', status=404)
+    if request.method == 'GET':
+        _require_role(request.user, project_id)
+        return _detail(TASKS, request, Task.objects, task_id)
+
+    _require_role(request.user, project_id, 'creator')
+    task = Task.objects.select_related('project').get(pk=task_id)
+    if request.method == 'DELETE':
+        task.delete()
+        return HttpResponse(status=204)
+
+    data = json_body(request)
+    current = model_to_dict(task, ['title', 'description', 'status'])
+    if 'assigned_to' not in data:
+        current['assigned_to'] = list(task.assigned_to.values_list('pk', flat=True))
+    form = TaskForm({**current, **data}, instance=task, project=task.project)
+    if not form.is_valid():
+        raise form_errors(form)
+    form.save()
+    return _detail(TASKS, request, Task.objects, task_id)
@@ -0,0 +1,144 @@
+import statistics
+import time
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from project.models import ProjectInvitation, ProjectMember
+from users.models import User
+from .seed import PASSWORD
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+class Step:
+    """
+    One request of a journey: what to send, as which user (None for anonymous)
+    and the status code that means it worked.
+    """
+
+    def __init__(self, path, method='get', data=None, user=None, status=200):
+        self.path = path
+        self.method = method
+        self.data = data or {}
+        self.user = user
+        self.status = status
+
+
+def _members(project):
+    return list(
+        User.objects.filter(project_memberships__project=project).order_by('project_memberships__id')
+    )
+
+
+def login(project, i):
+    members = _members(project)
+    return Step(
+        reverse('accounts:login'), 'post',
+        {'email': members[i % len(members)].email, 'password': PASSWORD}, status=302,
+    )
+
+
+def project_list(project, i):
+    return Step(reverse('project:project_list'), user=project.created_by)
+
+
+def project_detail(project, i):
+    return Step(reverse('project:project_detail', args=[project.pk]), user=project.created_by)
+
+
+def invite(project, i):
+    return Step(
+        reverse('project:project_invite', args=[project.pk]), 'post',
+        {'email': f'journey-invite-{i}@bench.test'}, user=project.created_by, status=302,
+    )
+
+
+def accept_invite(project, i):
+    # Each iteration needs an invitation nobody has accepted yet.
+    invitee = User.objects.create(
+        email=f'journey-invitee-{i}@bench.test', first_name='Bench', last_name='Invitee',
+        password=project.created_by.password, is_active=True,
+    )
+    invitation = ProjectInvitation.objects.create(project=project, user=invitee, invited_by=project.created_by)
+    return Step(
+        reverse('project:accept_project_invite', args=[invitation.token]), user=invitee, status=302,
+    )
+
+
+def create_task(project, i):
+    assignee = ProjectMember.objects.filter(project=project).values_list('user_id', flat=True).last()
+    return Step(
+        reverse('task:create_task', args=[project.pk]), 'post',
+        {'title': f'Journey task {i}', 'description': 'Created by the benchmark', 'status': 'todo',
+         'assigned_to': [assignee]},
+        user=project.created_by, status=302,
+    )
+
+
+def dashboard(project, i):
+    return Step(reverse('project:dashboard'), user=project.created_by)
+
+
+JOURNEYS = {
+    'login': login,
+    'project_list': project_list,
+    'project_detail': project_detail,
+    'invite': invite,
+    'accept_invite': accept_invite,
+    'create_task': create_task,
+    'dashboard': dashboard,
+}
+
+
+def run_journey(name, project, iterations, warmup=1):
+    """
+    Times `iterations` requests of journey `name` against `project` with the test
+    client, after `warmup` untimed ones. Preparing each request and logging the
+    client in are not timed. Returns latency, throughput and query count figures.
+    """
+    if iterations < 2:
+        raise ValueError('At least 2 iterations are needed for percentiles.')
+    make_step = JOURNEYS[name]
+    client = Client()
+    current_user = None
+    timings = []
+    query_counts = []
+
+    # Logins from one address would otherwise be locked out by the rate limiter.
+    no_rate_limits = override_settings(RATELIMIT_RATES={'login': '1000000/s', 'otp': '1000000/s'})
+    with no_rate_limits:
+        for i in range(warmup + iterations):
+            step = make_step(project, i)
+            if step.user != current_user or step.user is None:
+                client.logout()
+                if step.user is not None:
+                    client.force_login(step.user)
+                current_user = step.user
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = getattr(client, step.method)(step.path, step.data)
+                elapsed = time.perf_counter() - started
+            if response.status_code != step.status:
+                raise JourneyFailed(f"{name} returned {response.status_code}, expected {step.status}.")
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+                query_counts.append(len(queries))
+
+    percentiles = statistics.quantiles(timings, n=100)
+    return {
+        'iterations': iterations,
+        'mean_ms': statistics.mean(timings),
+        'median_ms': statistics.median(timings),
+        'p95_ms': percentiles[94],
+        'min_ms': min(timings),
+        'max_ms': max(timings),
+        'throughput_rps': len(timings) / (sum(timings) / 1000),
+        'queries': statistics.median_low(query_counts),
+        'queries_max': max(query_counts),
+    }
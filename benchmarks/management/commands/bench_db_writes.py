@@ -0,0 +1,70 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+
+from mailer.models import OutgoingEmail
+from mailer.services import enqueue_mail
+from users.models import OneTimePassword
+from users.otp import issue_otp
+
+DOMAIN = 'bench-writes.test'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures concurrent write throughput of the configured database (pick one with '
+        'DB_PROFILE). Each write is one transaction that issues an OTP and queues an email, '
+        'like the registration, password reset and invite views. The rows are removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers.')
+        parser.add_argument('--writes', type=int, default=200, help='Transactions per writer.')
+
+    def handle(self, *args, **options):
+        lock = threading.Lock()
+        timings = []
+        errors = []
+
+        def writer(number):
+            try:
+                for i in range(options['writes']):
+                    email = f'writer{number}-{i}@{DOMAIN}'
+                    started = time.perf_counter()
+                    try:
+                        with transaction.atomic():
+                            issue_otp(email, 'verify')
+                            enqueue_mail('Benchmark', 'Benchmark message', None, [email])
+                    except OperationalError as e:
+                        with lock:
+                            errors.append(str(e))
+                        continue
+                    with lock:
+                        timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        OneTimePassword.objects.filter(email__endswith=f'@{DOMAIN}').delete()
+        OutgoingEmail.objects.filter(to__endswith=f'@{DOMAIN}').delete()
+
+        self.stdout.write(f"profile: {settings.DB_PROFILE} ({connection.vendor})")
+        if len(timings) >= 2:
+            percentiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f"{len(timings)} transactions in {elapsed:.2f}s: {len(timings) / elapsed:.1f} tx/s, "
+                f"p50 {percentiles[49]:.2f}ms, p95 {percentiles[94]:.2f}ms"
+            )
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{len(errors)} failed, e.g. {errors[0]}"))
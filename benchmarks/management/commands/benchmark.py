@@ -0,0 +1,97 @@
+import json
+import platform
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from benchmarks.journeys import JOURNEYS, JourneyFailed, run_journey
+from benchmarks.seed import DEFAULT_SCALE, seed
+from project.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds a throwaway test database and measures latency, throughput and query counts '
+        'of the main user journeys with the test client. Results are written as JSON; pass '
+        'an earlier result with --baseline to compare runs.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SCALE.items():
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the generated data.')
+        parser.add_argument(
+            '--journey', action='append', choices=list(JOURNEYS),
+            help='Journey to run. Repeat for several; all by default.',
+        )
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per journey.')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per journey.')
+        parser.add_argument('--label', default='', help='Free text stored with the results.')
+        parser.add_argument('--output', help='File to write the JSON results to (stdout by default).')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against.')
+
+    def handle(self, *args, **options):
+        scale = {name: options[name] for name in DEFAULT_SCALE}
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+
+        # The same kind of database the test runner uses, so real data is never touched.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                cache.clear()
+                try:
+                    seed(seed=options['seed'], **scale)
+                except ValueError as e:
+                    raise CommandError(str(e))
+                project = Project.objects.select_related('created_by').order_by('pk').first()
+                if project is None:
+                    raise CommandError('At least one project is needed.')
+
+                results = {}
+                for name in options['journey'] or JOURNEYS:
+                    try:
+                        results[name] = run_journey(name, project, options['iterations'], options['warmup'])
+                    except (JourneyFailed, ValueError) as e:
+                        raise CommandError(str(e))
+                    self.stderr.write(self.summary(name, results[name], (baseline or {}).get(name)))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            cache.clear()
+
+        report = json.dumps({
+            'meta': {
+                'label': options['label'],
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'scale': scale,
+                'seed': options['seed'],
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+            },
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+    def summary(self, name, result, previous=None):
+        line = (
+            f"{name}: median {result['median_ms']:.2f}ms, p95 {result['p95_ms']:.2f}ms, "
+            f"{result['throughput_rps']:.1f} req/s, {result['queries']} queries"
+        )
+        if previous:
+            change = (result['median_ms'] - previous['median_ms']) / previous['median_ms'] * 100
+            line += f" (median {change:+.1f}%, queries {result['queries'] - previous['queries']:+d})"
+        return line
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.seed import CHUNK_SIZE, DEFAULT_SCALE, seed
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills the database with synthetic users, projects, members, tasks and invitations '
+        'for scale testing. members, tasks and invitations are per project. '
+        'All users share the password "benchmark-password".'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_SCALE.items():
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the generated data.')
+        parser.add_argument('--domain', default='bench.test', help='Email domain of the generated users.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows per insert and transaction.')
+
+    def handle(self, *args, **options):
+        domain = options['domain']
+        if User.objects.filter(email__iendswith=f'@{domain}').exists():
+            raise CommandError(f"There are already users @{domain}; pick another --domain.")
+
+        started = time.monotonic()
+        reported = {}
+
+        def progress(result):
+            # One line per table and per 100 chunks, not per chunk.
+            for key, count in result.items():
+                if count and (count - reported.get(key, 0) >= options['chunk_size'] * 100 or key not in reported):
+                    reported[key] = count
+                    self.stdout.write(f"{key}: {count} ({time.monotonic() - started:.1f}s)")
+
+        try:
+            result = seed(
+                **{name: options[name] for name in DEFAULT_SCALE},
+                seed=options['seed'], domain=domain, chunk_size=options['chunk_size'], progress=progress,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.monotonic() - started
+        total = sum(result.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s): "
+            + ', '.join(f"{count} {key}" for key, count in result.items())
+            + ". Run rebuild_search_index to make them searchable."
+        ))
@@ -0,0 +1,117 @@
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from project.models import Project, ProjectInvitation, ProjectMember
+from task.models import Task
+from users.models import User
+
+# Every seeded user has this password, hashed once and shared by all rows.
+PASSWORD = 'benchmark-password'
+
+# members, tasks and invitations are per project
+DEFAULT_SCALE = {'users': 200, 'projects': 20, 'members': 10, 'tasks': 50, 'invitations': 5}
+
+CHUNK_SIZE = 5000
+
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+
+
+def _insert(model, rows, chunk_size, result, key, progress, after=None, ids=None):
+    """
+    Inserts `rows` with bulk_create, one transaction per chunk, appending the new
+    primary keys to `ids` if given. `after` is called with each inserted chunk
+    inside its transaction, for rows that depend on the new keys.
+    """
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        with transaction.atomic():
+            model.objects.bulk_create(chunk)
+            if after:
+                after(chunk)
+        if ids is not None:
+            ids += [obj.pk for obj in chunk]
+        result[key] += len(chunk)
+        if progress:
+            progress(result)
+
+
+def seed(users, projects, members, tasks, invitations, seed=0, domain='bench.test',
+         chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Creates `users` users and `projects` projects, each with `members` members
+    (its creator included), `tasks` tasks assigned to one member each and
+    `invitations` pending invitations. The data is the same for a given `seed`;
+    users get emails like user0@<domain>.
+
+    Rows are generated lazily and inserted chunk by chunk with bulk_create, so
+    memory stays flat apart from the user ids and each project's member ids.
+    Model signals do not run: run rebuild_search_index to make the data searchable.
+
+    `progress` is called with the running totals after every chunk.
+    Returns a dict with the number of users, projects, members, tasks,
+    assignments and invitations created.
+    """
+    if not 1 <= members <= users:
+        raise ValueError('Projects need between 1 and `users` members.')
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    result = dict.fromkeys(['users', 'projects', 'members', 'tasks', 'assignments', 'invitations'], 0)
+
+    user_ids = []
+    _insert(User, (
+        User(email=f'user{i}@{domain}', first_name='Bench', last_name=f'User {i}', password=password, is_active=True)
+        for i in range(users)
+    ), chunk_size, result, 'users', progress, ids=user_ids)
+
+    project_ids = []
+    _insert(Project, (
+        Project(name=f'Project {i}', description=f'Benchmark project {i}', created_by_id=user_ids[i % users])
+        for i in range(projects)
+    ), chunk_size, result, 'projects', progress, ids=project_ids)
+
+    # The creator comes first; the others are drawn from the remaining users.
+    project_members = []
+    for i in range(projects):
+        creator = i % users
+        others = [j + (j >= creator) for j in rng.sample(range(users - 1), members - 1)]
+        project_members.append([user_ids[creator]] + [user_ids[j] for j in others])
+
+    _insert(ProjectMember, (
+        ProjectMember(project_id=project_id, user_id=user_id, role='contributor' if j else 'creator')
+        for project_id, member_ids in zip(project_ids, project_members)
+        for j, user_id in enumerate(member_ids)
+    ), chunk_size, result, 'members', progress)
+
+    through = Task.assigned_to.through
+
+    def assign(chunk):
+        through.objects.bulk_create([through(task_id=task.pk, user_id=task.seed_assignee_id) for task in chunk])
+        result['assignments'] += len(chunk)
+
+    def task_rows():
+        for n, (project_id, member_ids) in enumerate(zip(project_ids, project_members)):
+            for i in range(tasks):
+                task = Task(
+                    project_id=project_id,
+                    title=f'Task {i}',
+                    description=f'Benchmark task {i} of project {n}',
+                    created_by_id=member_ids[0],
+                    status=rng.choice(STATUSES),
+                )
+                task.seed_assignee_id = rng.choice(member_ids)
+                yield task
+
+    _insert(Task, task_rows(), chunk_size, result, 'tasks', progress, after=assign)
+
+    _insert(ProjectInvitation, (
+        ProjectInvitation(project_id=project_id, email=f'invitee{n}-{i}@{domain}', invited_by_id=member_ids[0])
+        for n, (project_id, member_ids) in enumerate(zip(project_ids, project_members))
+        for i in range(invitations)
+    ), chunk_size, result, 'invitations', progress)
+
+    return result
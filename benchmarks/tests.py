@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from project.models import Project
+from task.models import Task
+from users.models import User
+from .journeys import JOURNEYS, run_journey
+from .seed import seed
+
+SMALL_SCALE = {'users': 6, 'projects': 2, 'members': 3, 'tasks': 4, 'invitations': 1}
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkTests(TestCase):
+    """
+    Runs every journey at a tiny scale so the benchmark keeps working as views change.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_journey_runs(self):
+        seed(**SMALL_SCALE)
+        project = Project.objects.select_related('created_by').order_by('pk').first()
+        for name in JOURNEYS:
+            with self.subTest(journey=name):
+                result = run_journey(name, project, iterations=2, warmup=0)
+                self.assertEqual(result['iterations'], 2)
+                self.assertGreater(result['queries_max'], 0)
+
+    def test_seed_is_deterministic(self):
+        def snapshot():
+            return list(Task.objects.order_by('pk').values_list('title', 'status', 'assigned_to__email'))
+
+        result = seed(**SMALL_SCALE, seed=7, chunk_size=3)
+        first = snapshot()
+        User.objects.all().delete()
+        self.assertFalse(Project.objects.exists())
+        seed(**SMALL_SCALE, seed=7, chunk_size=5)
+        self.assertEqual(snapshot(), first)
+        self.assertEqual(result, {
+            'users': 6, 'projects': 2, 'members': 6, 'tasks': 8, 'assignments': 8, 'invitations': 2,
+        })
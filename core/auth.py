@@ -0,0 +1,29 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+
+
+async def aget_user(request):
+    """
+    Returns request.user from async code. request.user is a lazy object whose first
+    access reads the session and user tables, which Django only allows from sync
+    code, so it is resolved in a thread once and is plain attribute access after that.
+    """
+    def resolve():
+        bool(request.user.is_authenticated)
+        return request.user
+    return await sync_to_async(resolve)()
+
+
+def async_login_required(view_func):
+    """
+    login_required for async views: redirects anonymous users to the login page.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        user = await aget_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
@@ -0,0 +1,87 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder cuts times to milliseconds. Rows sharing a millisecond
+        # at a page boundary would then be skipped, so keep the microseconds.
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    """
+    Encodes the sort key values of the last row on a page into an opaque URL-safe token.
+    """
+    raw = json.dumps(list(values), cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, fields):
+    """
+    Decodes a token made by encode_cursor back into python values for `fields`.
+    Raises InvalidCursor if the token was tampered with or does not match the fields.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor.')
+
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor('Cursor does not match the ordering.')
+
+    try:
+        return [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(fields, values)
+        ]
+    except ValidationError:
+        raise InvalidCursor('Malformed cursor.')
+
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=25):
+    """
+    Returns (rows, next_cursor) for one page of `queryset` using keyset pagination.
+
+    `ordering` is a list of local field names, each optionally prefixed with '-',
+    and must end with a unique field (usually the primary key) so the order is total.
+    Each page is a range scan starting right after the previous page's last row, so
+    page 500 costs the same as page 1 when an index matches the ordering.
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    queryset = queryset.order_by(*ordering)
+
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, ordering)
+        after = Q()
+        for i, field in enumerate(ordering):
+            name = fields[i]
+            lookup = '__lt' if field.startswith('-') else '__gt'
+            condition = Q(**{name + lookup: values[i]})
+            for prev_name, prev_value in zip(fields[:i], values[:i]):
+                condition &= Q(**{prev_name: prev_value})
+            after |= condition
+        queryset = queryset.filter(after)
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            last[name] if isinstance(last, dict) else getattr(last, name)
+            for name in fields
+        )
+    return rows, next_cursor
@@ -0,0 +1,302 @@
+import cProfile
+import contextvars
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_lock = threading.Lock()
+_recent = deque(maxlen=settings.PROFILING_BUFFER_SIZE)
+_totals = {}
+
+
+class RequestProfile:
+    """
+    What one request spent its time on. Filled in by the query wrapper and by
+    timed() blocks while the request is the current one.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = Counter()
+        self.sections = defaultdict(float)
+        self.active = set()
+
+
+@contextmanager
+def timed(section):
+    """
+    Adds the time spent in the block to `section` of the current request's profile.
+    Does nothing outside a profiled request, so it can stay in library code.
+    """
+    profile = _current.get()
+    if profile is None or section in profile.active:
+        # Nested blocks of the same section are counted once, by the outer one.
+        yield
+        return
+    profile.active.add(section)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.sections[section] += time.perf_counter() - started
+        profile.active.discard(section)
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_seconds += time.perf_counter() - started
+        # Parameters are separate, so repeats of one statement with different
+        # values share a key: the shape of an N+1 loop.
+        profile.statements[sql] += 1
+
+
+def _install_query_wrapper(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _install():
+    """
+    Hooks query and template timing in. Connections are per thread, so the query
+    wrapper is added to each one as it is opened; it reads the current profile
+    from a context variable, which also follows async views into the threads
+    that run their ORM calls.
+    """
+    for connection in connections.all(initialized_only=True):
+        _install_query_wrapper(connection)
+    connection_created.connect(_install_query_wrapper, dispatch_uid='core.profiling')
+
+    from django.template.backends.django import Template
+    if getattr(Template.render, 'profiled', False):
+        return
+    render = Template.render
+
+    @wraps(render)
+    def profiled_render(self, context=None, request=None):
+        with timed('template'):
+            return render(self, context, request)
+    profiled_render.profiled = True
+    Template.render = profiled_render
+
+
+def _record(entry):
+    with _lock:
+        _recent.append(entry)
+        totals = _totals.setdefault(entry['view'], {
+            'statuses': Counter(),
+            'seconds': 0.0,
+            'buckets': [0] * len(DURATION_BUCKETS),
+            'queries': 0,
+            'db_seconds': 0.0,
+            'template_seconds': 0.0,
+            'mail_seconds': 0.0,
+            'n_plus_one_suspects': 0,
+        })
+        seconds = entry['wall_ms'] / 1000
+        totals['statuses'][entry['status']] += 1
+        totals['seconds'] += seconds
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                totals['buckets'][i] += 1
+        totals['queries'] += entry['db_queries']
+        totals['db_seconds'] += entry['db_ms'] / 1000
+        totals['template_seconds'] += entry['template_ms'] / 1000
+        totals['mail_seconds'] += entry['mail_ms'] / 1000
+        totals['n_plus_one_suspects'] += len(entry['duplicate_queries'])
+
+
+def recent_requests():
+    """
+    Returns the profiles of the latest requests, oldest first.
+    """
+    with _lock:
+        return list(_recent)
+
+
+def reset():
+    with _lock:
+        _recent.clear()
+        _totals.clear()
+
+
+def render_metrics():
+    """
+    Returns the per-view totals in the Prometheus text exposition format.
+    """
+    with _lock:
+        totals = {view: {**data, 'statuses': dict(data['statuses']), 'buckets': list(data['buckets'])}
+                  for view, data in _totals.items()}
+
+    lines = [
+        '# HELP taskly_requests_total Requests handled, by view and status code.',
+        '# TYPE taskly_requests_total counter',
+    ]
+    for view, data in sorted(totals.items()):
+        for status, count in sorted(data['statuses'].items()):
+            lines.append(f'taskly_requests_total{{view="{view}",status="{status}"}} {count}')
+
+    lines += [
+        '# HELP taskly_request_duration_seconds Wall time of requests, by view.',
+        '# TYPE taskly_request_duration_seconds histogram',
+    ]
+    for view, data in sorted(totals.items()):
+        count = sum(data['statuses'].values())
+        for bound, bucket in zip(DURATION_BUCKETS, data['buckets']):
+            lines.append(f'taskly_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {bucket}')
+        lines.append(f'taskly_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {count}')
+        lines.append(f'taskly_request_duration_seconds_sum{{view="{view}"}} {data["seconds"]:.6f}')
+        lines.append(f'taskly_request_duration_seconds_count{{view="{view}"}} {count}')
+
+    counters = [
+        ('db_queries_total', 'queries', 'Database queries run, by view.', 'd'),
+        ('db_seconds_total', 'db_seconds', 'Time spent in database queries, by view.', '.6f'),
+        ('template_seconds_total', 'template_seconds', 'Time spent rendering templates, by view.', '.6f'),
+        ('mail_seconds_total', 'mail_seconds', 'Time spent queueing or sending mail, by view.', '.6f'),
+        ('n_plus_one_suspects_total', 'n_plus_one_suspects', 'Statements repeated within one request, by view.', 'd'),
+    ]
+    for name, key, help_text, fmt in counters:
+        lines += [f'# HELP taskly_{name} {help_text}', f'# TYPE taskly_{name} counter']
+        for view, data in sorted(totals.items()):
+            lines.append(f'taskly_{name}{{view="{view}"}} {data[key]:{fmt}}')
+    return '\n'.join(lines) + '\n'
+
+
+class ProfilingMiddleware:
+    """
+    Records wall time, database queries and time, template render time and mail
+    time for every request when settings.PROFILING_ENABLED is on, and flags
+    statements repeated settings.PROFILING_DUPLICATE_QUERY_THRESHOLD times or more
+    as N+1 suspects. Profiles go to an in-memory ring buffer and per-view totals
+    served by metrics_view.
+
+    A settings.PROFILING_SAMPLE_RATE share of sync requests also runs under
+    cProfile; the stats are kept for those slower than settings.PROFILING_SLOW_MS.
+    Everything is per process.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        profiler = cProfile.Profile() if random.random() < settings.PROFILING_SAMPLE_RATE else None
+        try:
+            if profiler:
+                profiler.enable()
+            response = self.get_response(request)
+        finally:
+            if profiler:
+                profiler.disable()
+            _current.reset(token)
+        self.finish(request, response, profile, profiler)
+        return response
+
+    async def __acall__(self, request):
+        # cProfile would also catch every other coroutine on the loop, so async
+        # requests are not sampled.
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, profile)
+        return response
+
+    def finish(self, request, response, profile, profiler=None):
+        wall_ms = (time.perf_counter() - profile.started) * 1000
+        view = getattr(request.resolver_match, 'view_name', None) or '<unresolved>'
+        duplicates = [
+            {'sql': sql, 'count': count}
+            for sql, count in profile.statements.most_common()
+            if count >= settings.PROFILING_DUPLICATE_QUERY_THRESHOLD
+        ]
+        if duplicates:
+            logger.warning(
+                f"Possible N+1 in {view}: {duplicates[0]['count']}x {duplicates[0]['sql'][:200]}"
+            )
+
+        entry = {
+            'at': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'wall_ms': wall_ms,
+            'db_queries': profile.queries,
+            'db_ms': profile.db_seconds * 1000,
+            'template_ms': profile.sections['template'] * 1000,
+            'mail_ms': profile.sections['mail'] * 1000,
+            'duplicate_queries': duplicates,
+            'profile': None,
+        }
+        if profiler is not None and wall_ms >= settings.PROFILING_SLOW_MS:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(30)
+            entry['profile'] = out.getvalue()
+        _record(entry)
+
+
+def _can_read_metrics(request):
+    if not settings.PROFILING_ENABLED:
+        return False
+    if request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS:
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, for INTERNAL_IPS and staff users.
+    """
+    if not _can_read_metrics(request):
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def recent_requests_view(request):
+    """
+    The ring buffer of request profiles as JSON, newest first.
+    """
+    if not _can_read_metrics(request):
+        raise Http404
+    return JsonResponse({'requests': recent_requests()[::-1]})
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parses a rate such as '5/m' or '100/h' into (limit, period in seconds).
+    """
+    limit, unit = rate.split('/')
+    return int(limit), PERIODS[unit]
+
+
+def _cache_key(*parts):
+    # Emails and IPv6 addresses are not safe in every cache backend's keys.
+    digest = hashlib.sha1(':'.join(parts).encode()).hexdigest()
+    return f'ratelimit:{parts[0]}:{digest}'
+
+
+def hit(group, identity, limit, period, lockout=0, now=None):
+    """
+    Records one attempt for `identity` in `group` and returns the number of seconds
+    the caller has to wait, or 0 if the attempt is allowed.
+
+    Uses a sliding window counter: the count of the current fixed window plus the
+    previous window's count weighted by how much of it still overlaps the sliding
+    window. Two cache keys per identity, updated with atomic add/incr. Going over
+    the limit locks the identity out for `lockout` seconds (or the rest of the
+    window when lockout is 0), during which attempts are no longer counted.
+    """
+    now = time.time() if now is None else now
+    window = int(now // period)
+    lock_key = _cache_key(group, identity, 'lock')
+    current_key = _cache_key(group, identity, str(window))
+    previous_key = _cache_key(group, identity, str(window - 1))
+
+    cached = cache.get_many([lock_key, previous_key])
+    retry_after = _locked(cached.get(lock_key), now)
+    if retry_after:
+        return retry_after
+
+    cache.add(current_key, 0, timeout=period * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        # The key expired between add() and incr().
+        cache.set(current_key, 1, timeout=period * 2)
+        current = 1
+
+    elapsed = (now % period) / period
+    if current + cached.get(previous_key, 0) * (1 - elapsed) <= limit:
+        return 0
+
+    retry_after = lockout or int(period * (1 - elapsed)) + 1
+    cache.set(lock_key, now + retry_after, timeout=retry_after)
+    return retry_after
+
+
+def _locked(locked_until, now):
+    if locked_until and locked_until > now:
+        return int(locked_until - now) + 1
+    return 0
+
+
+def locked(group, identity, now=None):
+    """
+    Returns the seconds left on the lockout of `identity` in `group`, without
+    counting an attempt, or 0 if it is not locked out.
+    """
+    now = time.time() if now is None else now
+    return _locked(cache.get(_cache_key(group, identity, 'lock')), now)
+
+
+def client_ip(request):
+    """
+    The address of the client. Behind RATELIMIT_TRUSTED_PROXY_HOPS reverse proxies,
+    REMOTE_ADDR is the nearest proxy's, so the address is read from X-Forwarded-For,
+    where each proxy appends the address it received the request from. Entries left
+    of those are set by the client and can not be trusted.
+    """
+    hops = settings.RATELIMIT_TRUSTED_PROXY_HOPS
+    if hops:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def submitted_email(request):
+    email = request.POST.get('email') or request.GET.get('email') or ''
+    return email.strip().lower()
+
+
+def record_failure(request):
+    """
+    Counts a failed attempt (a wrong password or code) against the email submitted
+    to a view decorated with ratelimit, or an attempt that costs something, such as
+    sending a mail. Once an email has `limit` of them in the window, it has to wait
+    for the rest of the window; there is no longer lockout, so nobody can keep a
+    chosen account locked out by failing on purpose.
+    """
+    group = getattr(request, '_ratelimit_group', None)
+    email = submitted_email(request)
+    if group is None or not email:
+        return
+    limit, period = parse_rate(settings.RATELIMIT_RATES[group])
+    # The attempt is counted after the fact, so the limit-th one already blocks the next.
+    hit(f'{group}:email', email, limit - 1, period)
+
+
+def _throttle(request, group):
+    """
+    Counts the request against its IP and checks its email, and returns a 429
+    response if either is over the limit, or None if the request may proceed.
+    """
+    email = submitted_email(request)
+    if not email:
+        return None
+
+    request._ratelimit_group = group
+    limit, period = parse_rate(settings.RATELIMIT_RATES[group])
+    retry_after = max(
+        locked(f'{group}:email', email),
+        hit(f'{group}:ip', client_ip(request), limit, period, settings.RATELIMIT_LOCKOUT_SECONDS),
+    )
+    if not retry_after:
+        return None
+
+    response = HttpResponse(
+        render_to_string('rate_limited.html', {'retry_after': retry_after}),
+        status=429,
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(group):
+    """
+    Throttles a view by client IP and by the submitted email address, using the
+    rate from settings.RATELIMIT_RATES[group]. Works on both sync and async views.
+
+    Only requests that carry an email (form posts and emailed verification links)
+    are counted, so simply displaying a form is never throttled. Every such request
+    counts against the IP, which is locked out for RATELIMIT_LOCKOUT_SECONDS when it
+    goes over; only the failures the view reports with record_failure count against
+    the email. Throttled requests
+    get a 429 before the view runs, and the response is rendered without the
+    request context so neither the session nor the user is loaded from the database.
+    """
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                # The cache client may block, so it runs in a thread like the ORM.
+                response = await sync_to_async(_throttle)(request, group)
+                if response is not None:
+                    return response
+                return await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                response = _throttle(request, group)
+                if response is not None:
+                    return response
+                return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
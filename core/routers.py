@@ -0,0 +1,153 @@
+import contextvars
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Set when a request sent any write to the primary, so the user's next requests
+# read from the primary too until the replica has caught up.
+PIN_COOKIE = 'replica_pin'
+
+_state = contextvars.ContextVar('replica_state', default=None)
+
+
+class _RequestState:
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica_reads = False
+
+
+class ReplicaRouter:
+    """
+    Sends reads to settings.REPLICA_DATABASE while a view marked with
+    replica_reads runs, and everything else to the primary. Reads stay on the
+    primary once the request has written anything, inside transactions, and for
+    REPLICA_STICKY_SECONDS after a request of the same browser wrote, so users
+    always see their own changes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica_reads or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return settings.REPLICA_DATABASE
+
+    def db_for_write(self, model, **hints):
+        # Also overrides the default of writing an instance back to the database
+        # it was read from, which for replica reads would be the replica.
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema through replication.
+        return db != settings.REPLICA_DATABASE
+
+
+class ReplicaPinMiddleware:
+    """
+    Tracks writes made while handling a request and sets PIN_COOKIE after one,
+    which keeps the browser's reads on the primary for REPLICA_STICKY_SECONDS.
+    Not used unless a replica is configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = _RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state = _RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(state, response)
+
+    def pin(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
+
+
+def _replica_stream(iterator):
+    """
+    Iterates a streaming response's content with replica reads on. The content
+    is produced after the view returned, outside ReplicaPinMiddleware.
+    """
+    state = _RequestState(pinned=False)
+    state.replica_reads = True
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+def replica_reads(view_func):
+    """
+    Marks a read-heavy view whose queries may go to the read replica.
+    Put it inside login_required, so the session user is loaded from the primary.
+    """
+    def start():
+        state = _state.get()
+        if state is None or state.pinned or state.wrote:
+            return None
+        state.replica_reads = True
+        return state
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            state = start()
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                if state is not None:
+                    state.replica_reads = False
+        return _wrapped_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        state = start()
+        try:
+            response = view_func(request, *args, **kwargs)
+        finally:
+            if state is not None:
+                state.replica_reads = False
+        if state is not None and not state.wrote and response.streaming:
+            response.streaming_content = _replica_stream(iter(response.streaming_content))
+        return response
+    return _wrapped_view
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -25,7 +26,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config('SECRET-KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = config('DEBUG', default=True, cast=bool)
 
 ALLOWED_HOSTS = []
 
@@ -40,10 +41,17 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'users',
-    'project'
+    'project',
+    'task',
+    'mailer',
+    'search',
+    'api',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
+    'core.routers.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,18 +79,132 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Compile every template once per process instead of re-reading and re-parsing
+    # it on each render. Explicit loaders cannot be combined with APP_DIRS.
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_PROFILE picks the database:
+#   sqlite        - SQLite in WAL mode with tuned pragmas (core.backends.sqlite3), the default
+#   sqlite-plain  - SQLite with Django's defaults, to compare against
+#   postgres      - PostgreSQL with persistent, health-checked connections (needs psycopg)
+DB_PROFILE = config('DB_PROFILE', default='sqlite')
+
+if DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='taskly'),
+            'USER': config('DB_USER', default='taskly'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # Seconds a connection is reused across requests. Persistent connections are
+            # per thread, so under ASGI set this to 0 and put a pooler such as PgBouncer
+            # in front of the database instead.
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            # Check a reused connection before the first query of each request, so a
+            # connection dropped by the server is replaced instead of failing the request.
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
+elif DB_PROFILE in ('sqlite', 'sqlite-plain'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.backends.sqlite3' if DB_PROFILE == 'sqlite' else 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown DB_PROFILE {DB_PROFILE!r}; use sqlite, sqlite-plain or postgres.")
+
+# Optional read replica, configured like the primary but with DB_REPLICA_NAME and/or
+# DB_REPLICA_HOST. Views marked with core.routers.replica_reads send their reads to it,
+# except for a user whose requests wrote in the last REPLICA_STICKY_SECONDS.
+# To try it with SQLite, point DB_REPLICA_NAME at a copy of the database file.
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+REPLICA_DATABASE = None
+if DB_REPLICA_NAME or DB_REPLICA_HOST:
+    REPLICA_DATABASE = 'replica'
+    DATABASES[REPLICA_DATABASE] = {
+        **DATABASES['default'],
+        'NAME': DB_REPLICA_NAME or DATABASES['default']['NAME'],
+        'HOST': DB_REPLICA_HOST or DATABASES['default'].get('HOST', ''),
+        # Tests use the primary for both, like a replica without lag.
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Should be longer than the replica usually lags behind the primary.
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/ref/settings/#caches
+
+# CACHE_PROFILE picks the cache backing sessions, rate limits and the access, dashboard
+# and user caches:
+#   locmem - per process memory, the default; fine for a single worker
+#   file   - files under CACHE_DIR, shared by the workers of one machine
+#   redis  - CACHE_URL on Redis or a Redis-compatible server, shared by every machine (needs redis)
+CACHE_PROFILE = config('CACHE_PROFILE', default='locmem')
+
+if CACHE_PROFILE == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'taskly',
+        }
+    }
+elif CACHE_PROFILE == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / '.cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+elif CACHE_PROFILE == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('CACHE_URL', default='redis://127.0.0.1:6379/1'),
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown CACHE_PROFILE {CACHE_PROFILE!r}; use locmem, file or redis.")
+
+for cache_settings in CACHES.values():
+    cache_settings['KEY_PREFIX'] = config('CACHE_KEY_PREFIX', default='taskly')
+
+# SESSION_STORE picks where sessions live:
+#   cached_db - the cache in front of the django_session table, the default. Reads come
+#               from the cache; writes go to both, so sessions survive a cache restart.
+#               Expired rows pile up: run `manage.py clearsessions` daily from cron.
+#   cache     - the cache only, no database queries at all. Sessions are lost when the
+#               cache is flushed or evicts them, and with locmem they are per worker.
+SESSION_STORE = config('SESSION_STORE', default='cached_db')
+if SESSION_STORE not in ('cached_db', 'cache'):
+    raise ImproperlyConfigured(f"Unknown SESSION_STORE {SESSION_STORE!r}; use cached_db or cache.")
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+
+# Loads the logged-in user from the cache instead of the users table on each request
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+# Seconds a logged-in user stays cached; saving or deleting the user drops it earlier
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
 
 
 # Password validation
@@ -133,7 +255,57 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 
+# Outbound mail queue, drained by `manage.py send_queued_mail`
+MAILER_MAX_ATTEMPTS = config('MAILER_MAX_ATTEMPTS', default=5, cast=int)
+MAILER_RETRY_BASE_SECONDS = config('MAILER_RETRY_BASE_SECONDS', default=60, cast=int)
+MAILER_RETRY_MAX_SECONDS = config('MAILER_RETRY_MAX_SECONDS', default=3600, cast=int)
+MAILER_LEASE_SECONDS = 300
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
 
-AUTH_USER_MODEL = 'users.User'
\ No newline at end of file
+# Profile image pipeline (users.images): uploads are re-encoded without their metadata
+# and capped at AVATAR_MAX_DIMENSION pixels a side; avatars are AVATAR_THUMBNAIL_SIZE
+# pixel squares in JPEG and WebP
+AVATAR_MAX_DIMENSION = 1024
+AVATAR_THUMBNAIL_SIZE = 128
+AVATAR_JPEG_QUALITY = 85
+
+AUTH_USER_MODEL = 'users.User'
+
+# Seconds an emailed verification or password reset code stays valid
+OTP_TTL_SECONDS = 3600
+
+LOGIN_URL = 'accounts:login'
+# Seconds a user's project memberships stay cached for access checks
+PROJECT_ACCESS_CACHE_TIMEOUT = 300
+
+# Seconds the per-user dashboard counters stay cached (signals invalidate them earlier)
+DASHBOARD_CACHE_TIMEOUT = 600
+
+# Attempts allowed per client IP, and failed attempts per email address, on the login
+# and OTP views. An IP over the limit is locked out for RATELIMIT_LOCKOUT_SECONDS; an
+# email only waits for the rest of the window.
+RATELIMIT_RATES = {
+    'login': config('RATELIMIT_LOGIN_RATE', default='10/m'),
+    'otp': config('RATELIMIT_OTP_RATE', default='5/m'),
+}
+RATELIMIT_LOCKOUT_SECONDS = config('RATELIMIT_LOCKOUT_SECONDS', default=900, cast=int)
+# Number of reverse proxies in front of the app, each appending to X-Forwarded-For.
+# 0 uses REMOTE_ADDR, which behind a proxy is the proxy's address for everyone.
+RATELIMIT_TRUSTED_PROXY_HOPS = config('RATELIMIT_TRUSTED_PROXY_HOPS', default=0, cast=int)
+
+# Where project events for open task boards are published. The default only reaches
+# clients connected to the same process; swap in a shared broker for several workers.
+PROJECT_EVENTS_BROKER = config('PROJECT_EVENTS_BROKER', default='project.events.InProcessBroker')
+# Seconds an event stream stays open before the browser is asked to reconnect
+PROJECT_EVENTS_STREAM_SECONDS = 300
+
+# Request profiling (core.profiling): per-view timings, query counts and N+1 suspects,
+# served at /metrics/ to INTERNAL_IPS and staff. Off unless PROFILING_ENABLED is set.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_BUFFER_SIZE = 500
+PROFILING_DUPLICATE_QUERY_THRESHOLD = 3
+# Share of requests run under cProfile, and how slow one must be to keep its stats
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_SLOW_MS = config('PROFILING_SLOW_MS', default=500, cast=int)
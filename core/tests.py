@@ -0,0 +1,183 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from project.models import Project, ProjectMember
+from . import profiling, routers
+from .pagination import keyset_paginate
+
+User = get_user_model()
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='', created_by=cls.user)
+        ProjectMember.objects.create(project=cls.project, user=cls.user, role='creator')
+
+    def setUp(self):
+        cache.clear()
+        profiling.reset()
+        self.client.force_login(self.user)
+
+    def test_request_is_profiled(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('project:project_detail', args=[self.project.pk]))
+        [entry] = profiling.recent_requests()
+        self.assertEqual(entry['view'], 'project:project_detail')
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['db_queries'], len(queries))
+        self.assertGreater(entry['template_ms'], 0)
+        self.assertGreaterEqual(entry['wall_ms'], entry['db_ms'])
+        self.assertEqual(entry['duplicate_queries'], [])
+        self.assertIsNone(entry['profile'])
+
+    def test_mail_time_is_recorded(self):
+        self.client.post(reverse('project:project_invite', args=[self.project.pk]), {'email': 'new@example.com'})
+        self.assertGreater(profiling.recent_requests()[-1]['mail_ms'], 0)
+
+    def test_repeated_statements_are_flagged(self):
+        def view(request):
+            for pk in range(3):
+                User.objects.filter(pk=pk).first()
+            return profiling.HttpResponse()
+
+        with self.assertLogs('core.profiling', 'WARNING'):
+            profiling.ProfilingMiddleware(view)(RequestFactory().get('/'))
+        [entry] = profiling.recent_requests()
+        self.assertEqual(entry['view'], '<unresolved>')
+        self.assertEqual(entry['duplicate_queries'][0]['count'], 3)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_MS=0)
+    def test_sampled_slow_request_keeps_its_profile(self):
+        self.client.get(reverse('project:project_list'))
+        self.assertIn('cumulative', profiling.recent_requests()[-1]['profile'])
+
+    def test_metrics_are_for_staff(self):
+        self.client.get(reverse('project:project_list'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+        # save() rather than update(), which would leave the cached session user as is
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+        response = self.client.get(reverse('metrics'))
+        self.assertContains(response, 'taskly_requests_total{view="project:project_list",status="200"} 1')
+        self.assertContains(response, 'taskly_request_duration_seconds_count{view="project:project_list"} 1')
+        self.assertEqual(
+            self.client.get(reverse('recent_requests')).json()['requests'][0]['view'], 'metrics'
+        )
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_metrics_are_off_when_profiling_is(self):
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+class SqliteBackendTests(TestCase):
+    def setUp(self):
+        if settings.DATABASES['default']['ENGINE'] != 'core.backends.sqlite3':
+            self.skipTest('Only for the tuned SQLite profile.')
+
+    def test_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+@override_settings(REPLICA_DATABASE='replica', REPLICA_STICKY_SECONDS=10)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.seen = []
+
+    def request(self, view, pinned=False):
+        request = RequestFactory().get('/')
+        if pinned:
+            request.COOKIES[routers.PIN_COOKIE] = '1'
+        return routers.ReplicaPinMiddleware(view)(request)
+
+    def reading_view(self, request):
+        self.seen.append(self.router.db_for_read(Project))
+        return HttpResponse()
+
+    def test_marked_views_read_from_replica(self):
+        response = self.request(routers.replica_reads(self.reading_view))
+        self.request(self.reading_view)
+        self.assertEqual(self.seen, ['replica', 'default'])
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+        self.assertEqual(self.router.db_for_read(Project), 'default')
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        @routers.replica_reads
+        def view(request):
+            self.reading_view(request)
+            self.assertEqual(self.router.db_for_write(Project), 'default')
+            return self.reading_view(request)
+
+        response = self.request(view)
+        self.assertEqual(self.seen, ['replica', 'default'])
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]['max-age'], 10)
+
+    def test_pinned_browser_reads_from_primary(self):
+        self.request(routers.replica_reads(self.reading_view), pinned=True)
+        self.assertEqual(self.seen, ['default'])
+
+    def test_streamed_content_reads_from_replica(self):
+        def rows():
+            for _ in range(2):
+                yield self.router.db_for_read(Project)
+
+        response = self.request(routers.replica_reads(lambda request: StreamingHttpResponse(rows())))
+        self.assertEqual(b''.join(response.streaming_content), b'replicareplica')
+
+    def test_cached_dashboard_counters_read_the_primary(self):
+        from project.dashboard import _stat_queries
+
+        @routers.replica_reads
+        def view(request):
+            self.seen.extend(queryset.db for queryset, aggregates in _stat_queries(User(pk=1)))
+            return HttpResponse()
+
+        self.request(view)
+        self.assertEqual(set(self.seen), {'default'})
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'project'))
+        self.assertTrue(self.router.allow_migrate('default', 'project'))
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_middleware_is_off_without_replica(self):
+        with self.assertRaises(routers.MiddlewareNotUsed):
+            routers.ReplicaPinMiddleware(self.reading_view)
+
+
+class KeysetPaginationTests(TestCase):
+    def test_page_boundary_inside_equal_timestamps(self):
+        owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        Project.objects.bulk_create(
+            Project(name=f'Project {i}', description='', created_by=owner) for i in range(30)
+        )
+        # Same updated_at for all, with sub-millisecond precision
+        Project.objects.update(updated_at=timezone.now().replace(microsecond=123456))
+
+        ordering = ['-updated_at', '-id']
+        first, cursor = keyset_paginate(Project.objects.all(), ordering, page_size=25)
+        second, last_cursor = keyset_paginate(Project.objects.all(), ordering, cursor=cursor, page_size=25)
+        self.assertEqual((len(first), len(second), last_cursor), (25, 5, None))
+        self.assertEqual(
+            [p.pk for p in first + second], list(Project.objects.order_by(*ordering).values_list('pk', flat=True))
+        )
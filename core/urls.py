@@ -19,10 +19,17 @@ from django.contrib import admin
 from django.urls import include, path
 from django.conf.urls.static import static
 
+from core.profiling import metrics_view, recent_requests_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('users.urls', namespace='accounts')),
-    path('projects/', include('project.urls', namespace='project'))
+    path('projects/', include('project.urls', namespace='project')),
+    path('tasks/', include('task.urls', namespace='task')),
+    path('search/', include('search.urls', namespace='search')),
+    path('api/', include('api.urls', namespace='api')),
+    path('metrics/', metrics_view, name='metrics'),
+    path('metrics/requests/', recent_requests_view, name='recent_requests'),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutgoingEmail
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'to')
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
+    actions = ['retry_now']
+    readonly_fields = ('created_at', 'sent_at', 'attempts', 'last_error')
+
+    def retry_now(self, request, queryset):
+        queryset.exclude(status='sent').update(status='pending', next_attempt_at=timezone.now())
+    retry_now.short_description = "Retry selected emails now"
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mailer.services import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = (
+        'Delivers the due emails in the outbox in batches, one SMTP connection per batch. '
+        'Messages that fail are retried by later runs with exponential backoff.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Maximum number of emails sent per connection.')
+        parser.add_argument('--loop', action='store_true', help='Keep draining the outbox until interrupted.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty (with --loop).')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        while True:
+            result = send_queued_mail(batch_size=batch_size)
+            if result['sent'] or result['failed']:
+                self.stdout.write(f"Sent {result['sent']} email(s), {result['failed']} failed.")
+
+            # A short batch means nothing else is due: failed messages are
+            # rescheduled into the future.
+            if result['sent'] + result['failed'] < batch_size:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,157 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from core.profiling import timed
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _outgoing_email(subject, message, from_email, recipient_list):
+    return OutgoingEmail(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=','.join(recipient_list),
+    )
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """
+    Stores an email in the outbox so it is delivered by the send_queued_mail worker.
+    The row is written in the caller's transaction, so the email is only queued
+    if the surrounding work commits.
+    """
+    email = _outgoing_email(subject, message, from_email, recipient_list)
+    with timed('mail'):
+        email.save()
+    return email
+
+
+async def aenqueue_mail(subject, message, from_email, recipient_list):
+    """
+    Async version of enqueue_mail for async views.
+    """
+    email = _outgoing_email(subject, message, from_email, recipient_list)
+    with timed('mail'):
+        await email.asave()
+    return email
+
+
+def enqueue_mass_mail(datatuple):
+    """
+    Queues several emails with a single INSERT.
+    datatuple is a sequence of (subject, message, from_email, recipient_list),
+    the same shape django.core.mail.send_mass_mail accepts.
+    """
+    emails = [
+        _outgoing_email(subject, message, from_email, recipient_list)
+        for subject, message, from_email, recipient_list in datatuple
+    ]
+    with timed('mail'):
+        return OutgoingEmail.objects.bulk_create(emails)
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff for a message that has failed `attempts` times.
+    """
+    base = _setting('MAILER_RETRY_BASE_SECONDS', 60)
+    cap = _setting('MAILER_RETRY_MAX_SECONDS', 60 * 60)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def _claim_batch(batch_size):
+    """
+    Leases up to batch_size due messages so concurrent workers do not send them twice.
+    The lease is a push of next_attempt_at into the future; it expires on its own
+    if the worker dies mid-batch.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=_setting('MAILER_LEASE_SECONDS', 300))
+
+    with transaction.atomic():
+        ids = list(
+            OutgoingEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            OutgoingEmail.objects.filter(id__in=ids).update(next_attempt_at=now + lease)
+
+    return list(OutgoingEmail.objects.filter(id__in=ids).order_by('id'))
+
+
+def _record_failure(email, error, now):
+    max_attempts = _setting('MAILER_MAX_ATTEMPTS', 5)
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+        logger.error(f"Giving up on email {email.pk} to {email.to} after {email.attempts} attempts: {error}")
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        logger.warning(f"Email {email.pk} to {email.to} failed (attempt {email.attempts}), retrying: {error}")
+
+
+def send_queued_mail(batch_size=100, connection=None):
+    """
+    Delivers one batch of due messages over a single SMTP connection.
+    Returns a dict with the number of messages sent and failed.
+    """
+    batch = _claim_batch(batch_size)
+    result = {'sent': 0, 'failed': 0}
+    if not batch:
+        return result
+
+    connection = connection or get_connection(fail_silently=False)
+    now = timezone.now()
+
+    try:
+        connection.open()
+    except Exception as e:
+        for email in batch:
+            _record_failure(email, e, now)
+        OutgoingEmail.objects.bulk_update(batch, ['status', 'attempts', 'last_error', 'next_attempt_at'])
+        result['failed'] = len(batch)
+        return result
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipients(),
+                connection=connection,
+            )
+            try:
+                with timed('mail'):
+                    message.send()
+            except Exception as e:
+                _record_failure(email, e, now)
+                result['failed'] += 1
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                email.last_error = ''
+                result['sent'] += 1
+    finally:
+        connection.close()
+        OutgoingEmail.objects.bulk_update(
+            batch, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at']
+        )
+
+    return result
@@ -0,0 +1,94 @@
+import io
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import OutgoingEmail
+from .services import enqueue_mail, enqueue_mass_mail, retry_delay, send_queued_mail
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP server unavailable')
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP server unreachable')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('not reached')
+
+
+@override_settings(MAILER_MAX_ATTEMPTS=3, MAILER_RETRY_BASE_SECONDS=60, MAILER_RETRY_MAX_SECONDS=3600)
+class SendQueuedMailTests(TestCase):
+    def make_due(self):
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+
+    def test_enqueue_does_not_send(self):
+        enqueue_mail('Hello', 'Body', None, ['a@example.com', 'b@example.com'])
+        self.assertEqual(mail.outbox, [])
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients(), ['a@example.com', 'b@example.com'])
+        self.assertEqual(email.status, 'pending')
+
+    @override_settings(EMAIL_BACKEND='mailer.tests.FailingBackend')
+    def test_failed_message_is_retried_with_growing_backoff(self):
+        enqueue_mail('Hello', 'Body', None, ['a@example.com'])
+        delays = []
+        for attempt in (1, 2):
+            started = timezone.now()
+            with self.assertLogs('mailer.services', 'WARNING'):
+                self.assertEqual(send_queued_mail(), {'sent': 0, 'failed': 1})
+            email = OutgoingEmail.objects.get()
+            self.assertEqual((email.status, email.attempts), ('pending', attempt))
+            self.assertIn('SMTP server unavailable', email.last_error)
+            delays.append(email.next_attempt_at - started)
+            # Not due yet, so the next run leaves it alone.
+            self.assertEqual(send_queued_mail(), {'sent': 0, 'failed': 0})
+            self.make_due()
+
+        self.assertGreaterEqual(delays[0], retry_delay(1))
+        self.assertGreaterEqual(delays[1], retry_delay(2))
+        self.assertGreater(delays[1], delays[0])
+
+    @override_settings(EMAIL_BACKEND='mailer.tests.FailingBackend')
+    def test_message_is_given_up_after_max_attempts(self):
+        enqueue_mail('Hello', 'Body', None, ['a@example.com'])
+        for _ in range(3):
+            with self.assertLogs('mailer.services', 'WARNING'):
+                send_queued_mail()
+            self.make_due()
+        email = OutgoingEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ('failed', 3))
+        self.assertEqual(send_queued_mail(), {'sent': 0, 'failed': 0})
+
+    @override_settings(EMAIL_BACKEND='mailer.tests.UnreachableBackend')
+    def test_unreachable_server_fails_the_whole_batch(self):
+        enqueue_mass_mail([('Hello', 'Body', None, [f'user{i}@example.com']) for i in range(3)])
+        with self.assertLogs('mailer.services', 'WARNING'):
+            self.assertEqual(send_queued_mail(), {'sent': 0, 'failed': 3})
+        self.assertEqual(set(OutgoingEmail.objects.values_list('attempts', flat=True)), {1})
+
+    def test_retry_delay_is_capped(self):
+        self.assertEqual(retry_delay(1).total_seconds(), 60)
+        self.assertEqual(retry_delay(3).total_seconds(), 240)
+        self.assertEqual(retry_delay(20).total_seconds(), 3600)
+
+    def test_command_drains_the_queue_in_batches(self):
+        enqueue_mass_mail([('Hello', 'Body', None, [f'user{i}@example.com']) for i in range(25)])
+        out = io.StringIO()
+        call_command('send_queued_mail', batch_size=10, stdout=out)
+
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(f'user{i}@example.com' for i in range(25)))
+        self.assertEqual(out.getvalue().splitlines(), [
+            'Sent 10 email(s), 0 failed.',
+            'Sent 10 email(s), 0 failed.',
+            'Sent 5 email(s), 0 failed.',
+        ])
+        self.assertFalse(OutgoingEmail.objects.exclude(status='sent').exists())
+        self.assertFalse(OutgoingEmail.objects.filter(sent_at__isnull=True).exists())
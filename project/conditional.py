@@ -0,0 +1,78 @@
+import hashlib
+
+from django.db.models import Count, OuterRef, Subquery
+
+from core.pagination import InvalidCursor, keyset_paginate
+
+from .models import Project, ProjectMember
+
+PROJECT_PAGE_SIZE = 24
+
+
+def _etag(request, *state):
+    """
+    Builds an ETag from the given state plus everything else the rendered page
+    depends on: the viewer, the full path (cursors, filters) and the CSRF secret
+    embedded in the page's forms.
+    """
+    parts = [request.user.pk, request.get_full_path(), request.META.get('CSRF_COOKIE', ''), *state]
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _project_state(request, project_id):
+    """
+    Returns (version, updated_at) of the project, or None if it does not exist.
+    Memoised on the request so the ETag and Last-Modified callbacks share one query.
+    """
+    if not hasattr(request, '_project_state'):
+        request._project_state = Project.objects.filter(pk=project_id) \
+            .values_list('version', 'updated_at').first()
+    return request._project_state
+
+
+def project_etag(request, pk=None, project_id=None):
+    state = _project_state(request, pk or project_id)
+    return _etag(request, state[0]) if state else None
+
+
+def project_last_modified(request, pk=None, project_id=None):
+    state = _project_state(request, pk or project_id)
+    return state[1] if state else None
+
+
+def project_list_page(request):
+    """
+    Returns (projects, next_cursor) for the page of the user's projects named by
+    ?cursor=, or None if the cursor is invalid. Memoised on the request, so the
+    ETag, Last-Modified and the view share the one LIMITed keyset query.
+    """
+    if not hasattr(request, '_project_list_page'):
+        member_count = ProjectMember.objects.filter(project=OuterRef('pk')) \
+            .values('project').annotate(count=Count('*')).values('count')
+        user_projects = Project.objects.filter(memberships__user=request.user) \
+            .select_related('created_by') \
+            .annotate(member_count=Subquery(member_count))
+        try:
+            request._project_list_page = keyset_paginate(
+                user_projects, ['-updated_at', '-id'],
+                cursor=request.GET.get('cursor'), page_size=PROJECT_PAGE_SIZE
+            )
+        except InvalidCursor:
+            request._project_list_page = None
+    return request._project_list_page
+
+
+def project_list_etag(request):
+    # Joining or leaving a project bumps its version and moves it to the top of
+    # the list, so the page's (id, version) pairs change with whatever it shows.
+    page = project_list_page(request)
+    if page is None:
+        return None
+    projects, next_cursor = page
+    return _etag(request, next_cursor, *(f'{project.pk}.{project.version}' for project in projects))
+
+
+def project_list_last_modified(request):
+    page = project_list_page(request)
+    # Newest first, so the first row was updated last.
+    return page[0][0].updated_at if page and page[0] else None
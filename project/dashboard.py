@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+
+from task.models import Task
+from .models import ProjectMember, ProjectInvitation
+
+STATS_CACHE_KEY = 'dashboard:stats:{user_id}'
+
+
+def _cache_key(user_id):
+    return STATS_CACHE_KEY.format(user_id=user_id)
+
+
+def _stat_queries(user):
+    """
+    Returns the (queryset, aggregates) pairs behind the dashboard, one per category.
+    They read the primary: the result is cached until a signal drops it, and
+    counters computed from a lagging replica would stay stale for the whole timeout.
+    """
+    return [
+        (ProjectMember.objects.using(DEFAULT_DB_ALIAS).filter(user=user), {'total': Count('id')}),
+        (Task.objects.using(DEFAULT_DB_ALIAS).filter(project__memberships__user=user), {
+            'todo': Count('id', filter=Q(status='todo')),
+            'in_progress': Count('id', filter=Q(status='in_progress')),
+            'done': Count('id', filter=Q(status='done')),
+        }),
+        (Task.objects.using(DEFAULT_DB_ALIAS).filter(assigned_to=user), {
+            'total': Count('id'),
+            'open': Count('id', filter=~Q(status='done')),
+        }),
+        (ProjectInvitation.objects.using(DEFAULT_DB_ALIAS).filter(Q(user=user) | Q(email=user.email), status='pending'), {
+            'pending': Count('id'),
+        }),
+    ]
+
+
+def _stats(projects, tasks, assigned, invitations):
+    return {
+        'projects': projects['total'],
+        'tasks_todo': tasks['todo'],
+        'tasks_in_progress': tasks['in_progress'],
+        'tasks_done': tasks['done'],
+        'assigned_to_me': assigned['total'],
+        'assigned_to_me_open': assigned['open'],
+        'pending_invitations': invitations['pending'],
+    }
+
+
+def compute_dashboard_stats(user):
+    """
+    Computes the dashboard counters for a user with one aggregate query per category.
+    """
+    return _stats(*[queryset.aggregate(**aggregates) for queryset, aggregates in _stat_queries(user)])
+
+
+async def acompute_dashboard_stats(user):
+    return _stats(*[await queryset.aaggregate(**aggregates) for queryset, aggregates in _stat_queries(user)])
+
+
+def get_dashboard_stats(user):
+    """
+    Returns the dashboard counters for a user from the cache, computing them on a miss.
+    Signal handlers drop the entry whenever one of the underlying rows changes.
+    """
+    key = _cache_key(user.pk)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(user)
+        cache.set(key, stats, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 600))
+    return stats
+
+
+async def aget_dashboard_stats(user):
+    """
+    Async version of get_dashboard_stats for async views.
+    """
+    key = _cache_key(user.pk)
+    stats = await cache.aget(key)
+    if stats is None:
+        stats = await acompute_dashboard_stats(user)
+        await cache.aset(key, stats, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 600))
+    return stats
+
+
+def invalidate_dashboard_stats(user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids if user_id is not None])
+
+
+def invalidate_project_dashboards(project_id):
+    """
+    Drops the cached counters of every member of a project.
+    """
+    invalidate_dashboard_stats(
+        ProjectMember.objects.filter(project_id=project_id).values_list('user_id', flat=True)
+    )
@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import json
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class InProcessBroker:
+    """
+    Publish/subscribe for project events within one server process.
+
+    A broker has two methods: publish(channel, event), callable from any thread,
+    and subscribe(channel), an async context manager yielding a subscription whose
+    get() coroutine returns the next event. Deployments running several processes
+    can point settings.PROJECT_EVENTS_BROKER at a broker class with the same
+    interface backed by a shared service.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.ids = itertools.count(1)
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+
+    def publish(self, channel, event):
+        event = {**event, 'id': next(self.ids)}
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self.lock:
+                self.subscriptions[channel].discard(subscription)
+                if not self.subscriptions[channel]:
+                    del self.subscriptions[channel]
+
+
+class Subscription:
+    def __init__(self, loop, queue_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, event):
+        # A client this far behind is better off reloading than replaying a backlog.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {'type': 'reset', 'id': event['id'], 'data': {}}
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+@lru_cache(maxsize=None)
+def _broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return _broker(settings.PROJECT_EVENTS_BROKER)
+
+
+def project_channel(project_id):
+    return f'project:{project_id}'
+
+
+def publish_project_event(project_id, type, data):
+    """
+    Sends an event to everyone watching the project, once the current
+    transaction commits so clients never see a change that is rolled back.
+    """
+    event = {'type': type, 'data': data}
+    transaction.on_commit(lambda: get_broker().publish(project_channel(project_id), event))
+
+
+def format_event(event):
+    """
+    Returns an event in the text/event-stream wire format.
+    """
+    data = json.dumps(event['data'], separators=(',', ':'), default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
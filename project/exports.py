@@ -0,0 +1,103 @@
+import csv
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from task.models import Task
+from .models import ProjectMember, ProjectInvitation
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def _member_rows(project_id, chunk_size):
+    return ProjectMember.objects.filter(project_id=project_id).order_by('id').values_list(
+        'user_id', 'user__email', 'user__first_name', 'user__last_name', 'role', 'added_at'
+    ).iterator(chunk_size=chunk_size)
+
+
+def _invitation_rows(project_id, chunk_size):
+    for row in ProjectInvitation.objects.filter(project_id=project_id).order_by('id').values_list(
+        'id', 'email', 'user__email', 'status', 'sent_at', 'accepted_at', 'invited_by__email'
+    ).iterator(chunk_size=chunk_size):
+        invitation_id, email, user_email, *rest = row
+        yield (invitation_id, email or user_email, *rest)
+
+
+def _task_rows(project_id, chunk_size):
+    """
+    Yields task rows with their assignees' emails flattened into the last column.
+    Assignees are fetched with one through-table query per chunk of tasks.
+    """
+    rows = Task.objects.filter(project_id=project_id).order_by('id').values_list(
+        'id', 'title', 'status', 'created_by__email', 'created_at', 'updated_at'
+    ).iterator(chunk_size=chunk_size)
+    through = Task.assigned_to.through
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+
+        assignees = {}
+        for task_id, email in through.objects.filter(
+            task_id__in=[row[0] for row in chunk]
+        ).order_by('task_id', 'user_id').values_list('task_id', 'user__email'):
+            assignees.setdefault(task_id, []).append(email)
+
+        for row in chunk:
+            yield (*row, assignees.get(row[0], []))
+
+
+EXPORTS = {
+    'members': (
+        ['user_id', 'email', 'first_name', 'last_name', 'role', 'added_at'],
+        _member_rows,
+    ),
+    'invitations': (
+        ['id', 'email', 'status', 'sent_at', 'accepted_at', 'invited_by'],
+        _invitation_rows,
+    ),
+    'tasks': (
+        ['id', 'title', 'status', 'created_by', 'created_at', 'updated_at', 'assigned_to'],
+        _task_rows,
+    ),
+}
+
+# Exports holding other people's email addresses, for the project creator only
+CREATOR_ONLY_EXPORTS = {'members', 'invitations'}
+
+
+class _Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer can feed a generator.
+    """
+    def write(self, value):
+        return value
+
+
+def export_lines(project_id, kind, fmt, chunk_size=CHUNK_SIZE):
+    """
+    Yields the encoded lines of a project export, header first for CSV.
+    Memory stays flat: rows are streamed from the database chunk by chunk.
+    """
+    header, row_source = EXPORTS[kind]
+    rows = row_source(project_id, chunk_size)
+
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(
+                ';'.join(value) if isinstance(value, list) else value for value in row
+            )
+    elif fmt == 'jsonl':
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            yield encoder.encode(dict(zip(header, row))) + '\n'
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
@@ -1,3 +1,6 @@
+import csv
+import io
+import re
 from django import forms
 from .models import Project, ProjectMember
 from django.contrib.auth import get_user_model
@@ -122,4 +125,63 @@ class AddMemberByEmailForm(forms.Form):
                  pass
 
 
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+class BulkInviteForm(forms.Form):
+    """
+    Form for inviting many people at once, from a pasted list or an uploaded CSV file.
+    """
+    MAX_EMAILS = 1000
+
+    emails = forms.CharField(
+        label='Email Addresses',
+        required=False,
+        widget=forms.Textarea(
+            attrs={
+                'class': 'w-full pl-10 pr-4 py-2 border border-gray-300 dark:border-gray-600 rounded-lg bg-white dark:bg-gray-700 text-gray-900 dark:text-gray-100 focus:ring-2 focus:ring-primary-500 focus:border-primary-500 outline-none transition duration-200',
+                'placeholder': 'One email per line, or separated by commas',
+                'rows': 8
+            }
+        )
+    )
+    csv_file = forms.FileField(
+        label='Or upload a CSV file',
+        required=False,
+        widget=forms.ClearableFileInput(
+            attrs={
+                'class': 'w-full text-sm text-gray-700 dark:text-gray-300',
+                'accept': '.csv,text/csv'
+            }
+        )
+    )
+
+    def clean_csv_file(self):
+        csv_file = self.cleaned_data.get('csv_file')
+        if not csv_file:
+            return []
+        try:
+            content = csv_file.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise forms.ValidationError("The CSV file must be UTF-8 encoded.")
+
+        # Accept any column layout: every cell that looks like an address is used.
+        return [
+            cell.strip()
+            for row in csv.reader(io.StringIO(content))
+            for cell in row
+            if '@' in cell
+        ]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        raw = cleaned_data.get('emails') or ''
+        emails = [email for email in re.split(r'[\s,;]+', raw) if email]
+        emails += cleaned_data.get('csv_file') or []
+
+        if not emails:
+            raise forms.ValidationError("Enter at least one email address or upload a CSV file.")
+        if len(emails) > self.MAX_EMAILS:
+            raise forms.ValidationError(f"You can invite at most {self.MAX_EMAILS} people at once.")
+
+        cleaned_data['email_list'] = emails
+        return cleaned_data
@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from project.models import Project
+from project.views import project_detail
+
+
+class Command(BaseCommand):
+    help = 'Measures project_detail render time with cold and warm template fragment caches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('--iterations', type=int, default=50, help='Renders per mode.')
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.select_related('created_by').get(pk=options['project_id'])
+        except Project.DoesNotExist:
+            raise CommandError(f"Project {options['project_id']} does not exist.")
+
+        user = project.created_by
+        path = reverse('project:project_detail', args=[project.pk])
+        factory = RequestFactory()
+
+        def render():
+            request = factory.get(path)
+            request.user = user
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = project_detail(request, pk=project.pk)
+                elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f"project_detail returned {response.status_code}.")
+            return elapsed, len(queries)
+
+        def drop_fragments():
+            # Only the fragments of this page, so a shared cache is left alone.
+            version = Project.objects.values_list('version', flat=True).get(pk=project.pk)
+            cache.delete_many([
+                make_template_fragment_key('sidebar'),
+                make_template_fragment_key('project_member_count', [project.pk, version]),
+                make_template_fragment_key('project_members', [project.pk, version, user.pk]),
+            ])
+
+        render()  # warm the template loader and the access cache
+        for mode in ('cold', 'warm'):
+            timings = []
+            for _ in range(options['iterations']):
+                if mode == 'cold':
+                    drop_fragments()
+                elapsed, query_count = render()
+                timings.append(elapsed * 1000)
+            self.stdout.write(
+                f"{mode}: mean {statistics.mean(timings):.2f}ms, "
+                f"median {statistics.median(timings):.2f}ms, {query_count} queries"
+            )
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from project.services import expire_stale_invitations
+
+
+class Command(BaseCommand):
+    help = 'Expires pending project invitations older than the expiry period. Meant to be run periodically (e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Invitations updated per transaction.')
+        parser.add_argument('--days', type=int, default=None, help='Expire invitations older than this many days (default: 7).')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches to let other writers in.')
+
+    def handle(self, *args, **options):
+        cutoff = None
+        if options['days'] is not None:
+            cutoff = timezone.now() - timezone.timedelta(days=options['days'])
+
+        total = 0
+        batches = 0
+        started = time.monotonic()
+        for expired in expire_stale_invitations(batch_size=options['batch_size'], cutoff=cutoff):
+            total += expired
+            batches += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+        elapsed = time.monotonic() - started
+
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {total} invitation(s) in {batches} batch(es), {elapsed:.2f}s ({rate:.0f} rows/s)."
+        ))
@@ -0,0 +1,29 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.exports import CHUNK_SIZE, EXPORTS, FORMATS, export_lines
+from project.models import Project
+
+
+class Command(BaseCommand):
+    help = "Streams a project's members, invitations or tasks as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write to (default: stdout).')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        project_id = options['project_id']
+        if not Project.objects.filter(pk=project_id).exists():
+            raise CommandError(f"Project {project_id} does not exist.")
+
+        lines = export_lines(project_id, options['kind'], options['fmt'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
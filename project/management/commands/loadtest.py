@@ -0,0 +1,111 @@
+import statistics
+import threading
+import time
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares request throughput of running servers, e.g. WSGI and ASGI deployments of '
+        'this project sharing one database:\n'
+        '  gunicorn core.wsgi -w 4 -b 127.0.0.1:8000\n'
+        '  uvicorn core.asgi:application --workers 4 --port 8001\n'
+        '  manage.py loadtest --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True, metavar='NAME=URL',
+            help='A server to load, given as name=base URL. Repeat to compare servers.',
+        )
+        parser.add_argument(
+            '--path', default=None,
+            help='Path to request. Defaults to the dashboard.',
+        )
+        parser.add_argument(
+            '--email', default=None,
+            help='Requests are sent logged in as this user. Anonymous if omitted.',
+        )
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent clients.')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per target.')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep or not url:
+                raise CommandError(f"--target must look like name=url, got {target!r}.")
+            targets.append((name, url.rstrip('/')))
+
+        headers = {}
+        if options['email']:
+            try:
+                user = User.objects.get(email=options['email'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['email']} does not exist.")
+            # A real session row, so every server sharing the database accepts it.
+            client = Client()
+            client.force_login(user)
+            headers['Cookie'] = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+        path = options['path'] or reverse('project:dashboard')
+        for name, base_url in targets:
+            result = self.run(base_url + path, headers, options['concurrency'], options['requests'])
+            self.stdout.write(
+                f"{name}: {result['throughput']:.1f} req/s, "
+                f"p50 {result['p50']:.1f}ms, p95 {result['p95']:.1f}ms, p99 {result['p99']:.1f}ms, "
+                f"{result['errors']} errors"
+            )
+
+    def run(self, url, headers, concurrency, total):
+        """
+        Sends `total` GET requests to `url` from `concurrency` threads and returns
+        throughput, latency percentiles and the number of failed requests.
+        """
+        remaining = iter(range(total))
+        lock = threading.Lock()
+        timings = []
+        errors = []
+
+        def worker():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                try:
+                    with urlopen(Request(url, headers=headers), timeout=30) as response:
+                        response.read()
+                        failed = response.status >= 400
+                except (HTTPError, URLError, OSError):
+                    failed = True
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    (errors if failed else timings).append(elapsed)
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - started
+
+        if len(timings) < 2:
+            raise CommandError(f"Too few successful requests to {url} ({len(errors)} failed).")
+        percentiles = statistics.quantiles(timings, n=100)
+        return {
+            'throughput': len(timings) / duration,
+            'p50': percentiles[49],
+            'p95': percentiles[94],
+            'p99': percentiles[98],
+            'errors': len(errors),
+        }
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+def add_missing_creator_memberships(apps, schema_editor):
+    """
+    project_list only reads memberships, so every creator must also be a member.
+    """
+    Project = apps.get_model('project', 'Project')
+    ProjectMember = apps.get_model('project', 'ProjectMember')
+    missing = Project.objects.exclude(
+        memberships__user=models.F('created_by')
+    ).values_list('id', 'created_by_id')
+    ProjectMember.objects.bulk_create(
+        [ProjectMember(project_id=project_id, user_id=user_id, role='creator') for project_id, user_id in missing],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-updated_at', '-id'], name='project_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectmember',
+            index=models.Index(fields=['user', 'project'], name='member_user_project_idx'),
+        ),
+        migrations.RunPython(add_missing_creator_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0002_project_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectinvitation',
+            index=models.Index(fields=['status', 'sent_at'], name='invite_status_sent_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.21 on 2026-10-18 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0004_project_version'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='projectinvitation',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='projectinvitation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('project', 'user'), name='unique_pending_invitation_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='projectinvitation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('project', 'email'), name='unique_pending_invitation_email'),
+        ),
+    ]
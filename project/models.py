@@ -3,16 +3,59 @@ from django.conf import settings
 from django.utils import timezone
 import uuid
 
+INVITATION_EXPIRY = timezone.timedelta(days=7)
+
 class Project(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='created_projects')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Incremented whenever the project, its members, invitations or tasks change;
+    # used in cache keys and ETags
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-updated_at', '-id'], name='project_updated_id_idx'),
+        ]
     
     def __str__(self):
         return self.name
 
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        """
+        Never writes `version` back for an existing row: the instance may have been
+        loaded before a bump, and writing its stale value would move the counter
+        backwards and reissue versions old ETags and cached fragments still carry.
+        """
+        if not self._state.adding and not force_insert:
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.attname for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            update_fields = [name for name in update_fields if name != 'version']
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+
+    @classmethod
+    def bump_version(cls, project_id):
+        """
+        Atomically increments the version of a project with a single UPDATE.
+        updated_at moves with it, so it can serve as the Last-Modified time.
+        """
+        cls.bump_versions([project_id])
+
+    @classmethod
+    def bump_versions(cls, project_ids):
+        """
+        Bumps several projects at once; `project_ids` may also be a values queryset.
+        """
+        cls.objects.filter(pk__in=project_ids).update(
+            version=models.F('version') + 1, updated_at=timezone.now()
+        )
+
 class ProjectMember(models.Model):
     ROLE_CHOICES = [
         ('creator', 'Creator'),
@@ -25,6 +68,9 @@ class ProjectMember(models.Model):
 
     class Meta:
         unique_together = ('project', 'user')
+        indexes = [
+            models.Index(fields=['user', 'project'], name='member_user_project_idx'),
+        ]
 
 class ProjectInvitation(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='invitations')
@@ -42,8 +88,19 @@ class ProjectInvitation(models.Model):
     invited_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='sent_project_invitations')
 
     class Meta:
-        unique_together = [('project', 'user', 'status'), ('project', 'email', 'status')]
+        indexes = [
+            models.Index(fields=['status', 'sent_at'], name='invite_status_sent_idx'),
+        ]
         constraints = [
+            # One open invitation per person and project; any number of past ones.
+            models.UniqueConstraint(
+                fields=['project', 'user'], condition=models.Q(status='pending'),
+                name='unique_pending_invitation_user',
+            ),
+            models.UniqueConstraint(
+                fields=['project', 'email'], condition=models.Q(status='pending'),
+                name='unique_pending_invitation_email',
+            ),
             models.CheckConstraint(
                 check=(
                     models.Q(user__isnull=False, email__isnull=True) |
@@ -54,7 +111,7 @@ class ProjectInvitation(models.Model):
         ]
         
     def has_expired(self):
-        expiration_period = timezone.now() - timezone.timedelta(days=7)
+        expiration_period = timezone.now() - INVITATION_EXPIRY
         return self.sent_at < expiration_period
         
 
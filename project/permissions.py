@@ -0,0 +1,81 @@
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import ProjectMember
+
+ROLES_CACHE_KEY = 'project:roles:{user_id}'
+
+
+def _cache_key(user_id):
+    return ROLES_CACHE_KEY.format(user_id=user_id)
+
+
+def get_project_roles(user):
+    """
+    Returns a {project_id: role} dict of every project the user is a member of.
+    The result is memoised on the user instance for the rest of the request and
+    kept in the Django cache for PROJECT_ACCESS_CACHE_TIMEOUT seconds.
+    """
+    if not user.is_authenticated:
+        return {}
+
+    roles = getattr(user, '_project_roles', None)
+    if roles is None:
+        key = _cache_key(user.pk)
+        roles = cache.get(key)
+        if roles is None:
+            # Always from the primary: roles read from a lagging replica right
+            # after a membership change would be cached for the whole timeout.
+            roles = dict(
+                ProjectMember.objects.using(DEFAULT_DB_ALIAS)
+                .filter(user=user).values_list('project_id', 'role')
+            )
+            cache.set(key, roles, getattr(settings, 'PROJECT_ACCESS_CACHE_TIMEOUT', 300))
+        user._project_roles = roles
+    return roles
+
+
+def get_project_role(user, project_id):
+    """
+    Returns the user's role in the project, or None if they are not a member.
+    """
+    return get_project_roles(user).get(int(project_id))
+
+
+def invalidate_project_roles(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+def project_access_required(role=None, project_kwarg='pk'):
+    """
+    Decorator for views that take a project id in their URL kwargs.
+    Raises PermissionDenied unless request.user is a member of the project
+    (with the given role, if one is passed) and sets request.project_role.
+    Works on both sync and async views.
+    """
+    def check(request, project_id):
+        user_role = get_project_role(request.user, project_id)
+        if user_role is None or (role is not None and user_role != role):
+            raise PermissionDenied("You do not have permission to access this project.")
+        request.project_role = user_role
+
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                await sync_to_async(check)(request, kwargs[project_kwarg])
+                return await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                check(request, kwargs[project_kwarg])
+                return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,162 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from mailer.services import enqueue_mass_mail
+from .dashboard import invalidate_dashboard_stats
+from .models import INVITATION_EXPIRY, Project, ProjectMember, ProjectInvitation
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+
+def invitation_email(project, invited_by, invite_link):
+    """
+    Returns the (subject, message) pair for a project invitation email.
+    """
+    subject = f'Invitation to join project: {project.name}'
+    message = f"""
+    Hi,
+
+    You've been invited by {invited_by.get_full_name()} to join the project "{project.name}".
+
+    Project Description: {project.description}
+
+    To accept the invitation, click on the link below:
+    {invite_link}
+
+    If you did not expect this invitation, please ignore this email.
+
+    The Team
+    """
+    return subject, message
+
+
+def bulk_invite(project, emails, invited_by, build_invite_link):
+    """
+    Invites every address in `emails` to `project`.
+
+    Existing users, current members and pending invitations are resolved with one
+    query each, the new invitations are inserted with a single bulk_create and the
+    emails are queued as one batch. build_invite_link is called with an invitation
+    and must return the absolute accept URL.
+
+    Returns a list of (email, status, message) tuples in input order, where status is
+    one of 'invited', 'member', 'pending', 'duplicate' or 'invalid'.
+    """
+    results = {}
+    order = []
+    candidates = []
+    seen = set()
+
+    for raw in emails:
+        email = User.objects.normalize_email(raw.strip())
+        key = email.lower()
+        order.append((email, key))
+        if key in seen:
+            continue
+        seen.add(key)
+        try:
+            validate_email(email)
+        except ValidationError:
+            results[key] = ('invalid', "Not a valid email address.")
+            continue
+        candidates.append(email)
+
+    if candidates:
+        # Addresses are matched case-insensitively, like the duplicate check above.
+        keys = [email.lower() for email in candidates]
+        users_by_email = {
+            user.email.lower(): user
+            for user in User.objects.annotate(email_key=Lower('email'))
+            .filter(email_key__in=keys).only('id', 'email')
+        }
+        member_emails = {
+            email.lower()
+            for email in ProjectMember.objects.annotate(email_key=Lower('user__email'))
+            .filter(project=project, email_key__in=keys).values_list('user__email', flat=True)
+        }
+        pending_emails = set()
+        for email, user_email in ProjectInvitation.objects.annotate(
+            email_key=Lower('email'), user_email_key=Lower('user__email')
+        ).filter(
+            Q(email_key__in=keys) | Q(user_email_key__in=keys),
+            project=project,
+            status='pending',
+        ).values_list('email', 'user__email'):
+            pending_emails.add((email or user_email).lower())
+
+        invitations = []
+        for email in candidates:
+            key = email.lower()
+            if key in member_emails:
+                results[key] = ('member', f"Already a member of {project.name}.")
+            elif key in pending_emails:
+                results[key] = ('pending', "An invitation has already been sent.")
+            else:
+                invited_user = users_by_email.get(key)
+                invitations.append(ProjectInvitation(
+                    project=project,
+                    user=invited_user,
+                    email=email if not invited_user else None,
+                    invited_by=invited_by,
+                ))
+                results[key] = ('invited', "Invitation sent.")
+
+        ProjectInvitation.objects.bulk_create(invitations)
+        # bulk_create does not send post_save, so drop the invitees' dashboards here.
+        invalidate_dashboard_stats([invitation.user_id for invitation in invitations])
+        if invitations:
+            Project.bump_version(project.pk)
+
+        from_email = settings.DEFAULT_FROM_EMAIL
+        datatuple = []
+        for invitation in invitations:
+            recipient = invitation.email or invitation.user.email
+            subject, message = invitation_email(project, invited_by, build_invite_link(invitation))
+            datatuple.append((subject, message, from_email, [recipient]))
+        enqueue_mass_mail(datatuple)
+
+        logger.info(f"User {invited_by.email} bulk invited {len(invitations)} people to project {project.name}")
+
+    report = []
+    reported = set()
+    for email, key in order:
+        if key in reported:
+            report.append((email, 'duplicate', "Listed more than once."))
+            continue
+        reported.add(key)
+        status, message = results[key]
+        report.append((email, status, message))
+    return report
+
+
+def expire_stale_invitations(batch_size=1000, cutoff=None):
+    """
+    Marks pending invitations sent before `cutoff` as expired, batch_size rows per
+    transaction so no single UPDATE holds locks for long. Yields the number of
+    invitations expired by each batch.
+    """
+    cutoff = cutoff or timezone.now() - INVITATION_EXPIRY
+    stale = ProjectInvitation.objects.filter(status='pending', sent_at__lt=cutoff)
+
+    while True:
+        with transaction.atomic():
+            rows = list(stale.order_by('sent_at', 'id').values_list('id', 'user_id')[:batch_size])
+            if not rows:
+                return
+
+            batch = ProjectInvitation.objects.filter(id__in=[invitation_id for invitation_id, _ in rows])
+            expired = batch.filter(status='pending').update(status='expired')
+            Project.bump_versions(batch.values('project_id'))
+        # update() does not send post_save, so drop the invitees' dashboards here.
+        invalidate_dashboard_stats({user_id for _, user_id in rows})
+        yield expired
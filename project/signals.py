@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .dashboard import invalidate_dashboard_stats
+from .events import publish_project_event
+from .models import Project, ProjectMember, ProjectInvitation
+from .permissions import invalidate_project_roles
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, raw, **kwargs):
+    # New projects start at version 1.
+    if not created and not raw:
+        Project.bump_version(instance.pk)
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def project_member_changed(sender, instance, **kwargs):
+    Project.bump_version(instance.project_id)
+    invalidate_project_roles(instance.user_id)
+    invalidate_dashboard_stats([instance.user_id])
+
+
+@receiver(post_save, sender=ProjectMember)
+def publish_member_saved(sender, instance, created, raw, **kwargs):
+    if not raw:
+        publish_project_event(instance.project_id, 'member.added' if created else 'member.updated', {
+            'id': instance.pk,
+            'user': instance.user_id,
+            'role': instance.role,
+        })
+
+
+@receiver(post_delete, sender=ProjectMember)
+def publish_member_removed(sender, instance, **kwargs):
+    publish_project_event(instance.project_id, 'member.removed', {'id': instance.pk, 'user': instance.user_id})
+
+
+@receiver(post_save, sender=ProjectInvitation)
+@receiver(post_delete, sender=ProjectInvitation)
+def project_invitation_changed(sender, instance, **kwargs):
+    Project.bump_version(instance.project_id)
+    # Email-only invitations are for people without an account, so there is no
+    # cached dashboard to drop; accepting one sets the user.
+    invalidate_dashboard_stats([instance.user_id])
@@ -1,3 +1,569 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import re
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from task.models import Task
+from .conditional import PROJECT_PAGE_SIZE
+from .dashboard import get_dashboard_stats
+from .events import InProcessBroker, get_broker, project_channel
+from .exports import export_lines
+from .models import Project, ProjectMember, ProjectInvitation
+from .services import bulk_invite, expire_stale_invitations
+
+User = get_user_model()
+
+
+class ProjectViewQueryCountTests(TestCase):
+    """
+    Pins the number of queries each project view runs so N+1 regressions fail CI.
+    Sessions come from the cache; counts include the user lookup done by the auth
+    middleware while the user is not cached yet.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.member = User.objects.create_user(
+            'member@example.com', 'password', first_name='Mark', last_name='Member', is_active=True
+        )
+        cls.outsider = User.objects.create_user(
+            'outsider@example.com', 'password', first_name='Otto', last_name='Outsider', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='Moon landing', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+        cls.membership = ProjectMember.objects.create(project=cls.project, user=cls.member, role='contributor')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def add_projects(self, count):
+        for i in range(count):
+            project = Project.objects.create(name=f'Project {i}', description='', created_by=self.owner)
+            ProjectMember.objects.create(project=project, user=self.owner, role='creator')
+            ProjectMember.objects.create(project=project, user=self.member, role='contributor')
+
+    def test_project_list(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('project:project_list'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_project_list_does_not_grow_with_projects(self):
+        self.add_projects(10)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('project:project_list'))
+        self.assertEqual(len(response.context['projects']), 11)
+
+    def test_project_create_get(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('project:project_create'))
+
+    def test_project_create_post(self):
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                reverse('project:project_create'), {'name': 'Gemini', 'description': 'Orbit'}
+            )
+        self.assertRedirects(response, reverse('project:project_list'), fetch_redirect_response=False)
+
+    def test_project_detail(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('project:project_detail', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_project_detail_member_list_follows_project_version(self):
+        self.client.get(reverse('project:project_detail', args=[self.project.pk]))
+        ProjectMember.objects.create(project=self.project, user=self.outsider, role='contributor')
+        response = self.client.get(reverse('project:project_detail', args=[self.project.pk]))
+        self.assertContains(response, 'Otto Outsider')
+        self.assertContains(response, 'View Members (3)')
+
+    def test_project_detail_with_warm_caches(self):
+        self.client.get(reverse('project:project_detail', args=[self.project.pk]))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('project:project_detail', args=[self.project.pk]))
+
+    def test_project_detail_does_not_grow_with_members(self):
+        for i in range(10):
+            user = User.objects.create_user(
+                f'user{i}@example.com', 'password', first_name='Extra', last_name=str(i), is_active=True
+            )
+            ProjectMember.objects.create(project=self.project, user=user, role='contributor')
+        with self.assertNumQueries(5):
+            self.client.get(reverse('project:project_detail', args=[self.project.pk]))
+
+    def test_project_detail_invite(self):
+        with self.assertNumQueries(10):
+            response = self.client.post(
+                reverse('project:project_detail', args=[self.project.pk]),
+                {'email': 'new@example.com', 'invite_member_submit': '1'},
+            )
+        self.assertEqual(response.status_code, 302)
+
+    def test_project_update_get(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('project:project_update', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_project_update_post(self):
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                reverse('project:project_update', args=[self.project.pk]),
+                {'name': 'Apollo 11', 'description': 'Moon landing'},
+            )
+        self.assertEqual(response.status_code, 302)
+
+    def test_project_invite(self):
+        with self.assertNumQueries(9):
+            response = self.client.post(
+                reverse('project:project_invite', args=[self.project.pk]), {'email': 'new@example.com'}
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(ProjectInvitation.objects.filter(email='new@example.com').exists())
+
+    def test_project_bulk_invite_does_not_grow_with_emails(self):
+        emails = '\n'.join(f'invitee{i}@example.com' for i in range(25))
+        with self.assertNumQueries(11):
+            response = self.client.post(
+                reverse('project:project_bulk_invite', args=[self.project.pk]), {'emails': emails}
+            )
+        self.assertEqual(ProjectInvitation.objects.filter(project=self.project).count(), 25)
+        self.assertEqual(len(response.context['results']), 25)
+
+    def test_accept_project_invite(self):
+        invitation = ProjectInvitation.objects.create(
+            project=self.project, user=self.outsider, invited_by=self.owner
+        )
+        self.client.force_login(self.outsider)
+        with self.assertNumQueries(11):
+            response = self.client.get(reverse('project:accept_project_invite', args=[invitation.token]))
+        self.assertRedirects(
+            response, reverse('project:project_detail', args=[self.project.pk]), fetch_redirect_response=False
+        )
+
+    def test_project_member_remove(self):
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse('project:project_member_remove', args=[self.membership.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(ProjectMember.objects.filter(pk=self.membership.pk).exists())
+
+    def test_member_remove_works_from_a_second_session(self):
+        url = reverse('project:project_detail', args=[self.project.pk])
+        self.client.get(url)  # caches the member list
+
+        other = Client(enforce_csrf_checks=True)
+        other.force_login(self.owner)
+        content = other.get(url).content.decode()
+        members = content[content.index('id="member-remove-form"'):content.index('id="add-member-modal"')]
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', members).group(1)
+        self.assertEqual(members.count('csrfmiddlewaretoken'), 1)
+
+        response = other.post(
+            reverse('project:project_member_remove', args=[self.membership.pk]), {'csrfmiddlewaretoken': token}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(ProjectMember.objects.filter(pk=self.membership.pk).exists())
+
+    def test_sidebar_fragment_is_shared(self):
+        self.client.get(reverse('project:project_list'))
+        self.assertIsNotNone(cache.get(make_template_fragment_key('sidebar')))
+
+    def test_project_detail_not_modified(self):
+        url = reverse('project:project_detail', args=[self.project.pk])
+        self.client.get(url)  # sets the CSRF cookie, which is part of the ETag
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        ProjectInvitation.objects.create(project=self.project, email='new@example.com', invited_by=self.owner)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_project_detail_etag_differs_per_user(self):
+        url = reverse('project:project_detail', args=[self.project.pk])
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_project_list_not_modified(self):
+        url = reverse('project:project_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.add_projects(1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_project_list_etag_tracks_which_projects(self):
+        url = reverse('project:project_list')
+        other = Project.objects.create(name='Other', description='', created_by=self.member)
+        self.project.refresh_from_db()
+        Project.objects.filter(pk=other.pk).update(version=self.project.version, updated_at=self.project.updated_at)
+        self.client.get(url)  # sets the CSRF cookie, which is part of the ETag
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Same count, version sum and latest update, but a different project
+        ProjectMember.objects.filter(project=self.project, user=self.owner).delete()
+        ProjectMember.objects.bulk_create([ProjectMember(project=other, user=self.owner, role='contributor')])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_stale_save_does_not_reuse_a_version(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        Project.bump_version(self.project.pk)
+        bumped = Project.objects.get(pk=self.project.pk).version
+
+        stale.name = 'Artemis'
+        stale.save()
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual((project.name, project.version), ('Artemis', bumped + 1))
+
+    def test_project_list_not_modified_later_page(self):
+        self.add_projects(30)
+        next_cursor = self.client.get(reverse('project:project_list')).context['next_cursor']
+        url = reverse('project:project_list') + f'?cursor={next_cursor}'
+        etag = self.client.get(url)['ETag']
+        # Only the LIMITed page query, whatever the number of projects
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn(f'LIMIT {PROJECT_PAGE_SIZE + 1}', queries.captured_queries[0]['sql'])
+
+        Project.bump_version(self.project.pk)  # on the second page
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_dashboard(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('project:dashboard'))
+        self.assertEqual(response.context['stats']['projects'], 1)
+
+    def test_dashboard_with_warm_cache(self):
+        self.client.get(reverse('project:dashboard'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('project:dashboard'))
+
+    def test_dashboard_cache_is_invalidated_by_membership_changes(self):
+        self.client.get(reverse('project:dashboard'))
+        self.add_projects(2)
+        response = self.client.get(reverse('project:dashboard'))
+        self.assertEqual(response.context['stats']['projects'], 3)
+
+    async def test_dashboard_under_asgi(self):
+        await sync_to_async(self.async_client.force_login)(self.owner)
+        response = await self.async_client.get(reverse('project:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stats']['projects'], 1)
+
+    async def test_dashboard_under_asgi_redirects_anonymous_users(self):
+        response = await self.async_client.get(reverse('project:dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+
+class BulkInviteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.member = User.objects.create_user(
+            'member@example.com', 'password', first_name='Mark', last_name='Member', is_active=True
+        )
+        cls.alice = User.objects.create_user(
+            'Alice@example.com', 'password', first_name='Alice', last_name='Able', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+        ProjectMember.objects.create(project=cls.project, user=cls.member, role='contributor')
+
+    def bulk_invite(self, emails):
+        return bulk_invite(self.project, emails, self.owner, lambda invitation: f'https://example.com/{invitation.token}')
+
+    def test_statuses(self):
+        ProjectInvitation.objects.create(project=self.project, email='waiting@example.com', invited_by=self.owner)
+        report = self.bulk_invite([
+            'new@example.com', 'MEMBER@example.com', 'Waiting@example.com', 'New@example.com', 'not-an-email',
+        ])
+        self.assertEqual([status for _, status, _ in report], ['invited', 'member', 'pending', 'duplicate', 'invalid'])
+        self.assertEqual(
+            list(ProjectInvitation.objects.order_by('pk').values_list('email', flat=True)),
+            ['waiting@example.com', 'new@example.com'],
+        )
+
+    def test_registered_user_matched_regardless_of_case(self):
+        [(_, status, _)] = self.bulk_invite(['alice@example.com'])
+        self.assertEqual(status, 'invited')
+        invitation = ProjectInvitation.objects.get(project=self.project)
+        self.assertEqual((invitation.user, invitation.email), (self.alice, None))
+
+        [(_, status, _)] = self.bulk_invite(['ALICE@example.com'])
+        self.assertEqual(status, 'pending')
+
+    def test_email_invitation_accepted_regardless_of_case(self):
+        invitation = ProjectInvitation.objects.create(
+            project=self.project, email='alice@example.com', invited_by=self.owner
+        )
+        self.client.force_login(self.alice)
+        self.client.get(reverse('project:accept_project_invite', args=[invitation.token]))
+        self.assertTrue(ProjectMember.objects.filter(project=self.project, user=self.alice).exists())
+
+
+class InvitationExpiryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.invitee = User.objects.create_user(
+            'invitee@example.com', 'password', first_name='Ivy', last_name='Invitee', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='', created_by=cls.owner)
+
+    def invite(self, days_ago, status='pending', **who):
+        invitation = ProjectInvitation.objects.create(
+            project=self.project, invited_by=self.owner, status=status, **who
+        )
+        # sent_at is auto_now_add
+        ProjectInvitation.objects.filter(pk=invitation.pk).update(sent_at=timezone.now() - timedelta(days=days_ago))
+        return invitation
+
+    def statuses(self):
+        return list(ProjectInvitation.objects.order_by('pk').values_list('status', flat=True))
+
+    def test_stale_invitations_expire_in_batches(self):
+        for i in range(5):
+            self.invite(10, email=f'old{i}@example.com')
+        self.invite(1, email='recent@example.com')
+        version = self.project.version
+
+        self.assertEqual(list(expire_stale_invitations(batch_size=2)), [2, 2, 1])
+        self.assertEqual(self.statuses(), ['expired'] * 5 + ['pending'])
+        self.project.refresh_from_db()
+        self.assertGreater(self.project.version, version)
+
+    def test_expiring_drops_the_invitees_dashboard(self):
+        cache.clear()
+        self.invite(10, user=self.invitee)
+        self.assertEqual(get_dashboard_stats(self.invitee)['pending_invitations'], 1)
+
+        self.assertEqual(sum(expire_stale_invitations()), 1)
+        self.assertEqual(get_dashboard_stats(self.invitee)['pending_invitations'], 0)
+
+    def test_expiring_again_keeps_history(self):
+        self.invite(30, status='expired', email='again@example.com')
+        self.invite(30, status='expired', user=self.invitee)
+        self.invite(10, email='again@example.com')
+        self.invite(10, user=self.invitee)
+
+        self.assertEqual(sum(expire_stale_invitations()), 2)
+        self.assertEqual(self.statuses(), ['expired'] * 4)
+
+    def test_one_pending_invitation_per_person(self):
+        self.invite(1, email='twice@example.com')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.invite(1, email='twice@example.com')
+
+    def test_accepting_a_stale_invitation_marks_it_expired(self):
+        self.invite(30, status='expired', user=self.invitee)
+        invitation = self.invite(10, user=self.invitee)
+        self.client.force_login(self.invitee)
+        response = self.client.get(reverse('project:accept_project_invite', args=[invitation.token]))
+        self.assertTemplateUsed(response, 'projects/invite_expired.html')
+        self.assertEqual(self.statuses(), ['expired', 'expired'])
+
+    def test_command(self):
+        for i in range(3):
+            self.invite(10, email=f'old{i}@example.com')
+        self.invite(3, email='recent@example.com')
+
+        out = io.StringIO()
+        call_command('expire_invitations', batch_size=2, days=2, stdout=out)
+        self.assertIn('Expired 4 invitation(s) in 2 batch(es)', out.getvalue())
+        self.assertEqual(self.statuses(), ['expired'] * 4)
+
+
+class ProjectExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.member = User.objects.create_user(
+            'member@example.com', 'password', first_name='Mark', last_name='Member', is_active=True
+        )
+        cls.outsider = User.objects.create_user(
+            'outsider@example.com', 'password', first_name='Otto', last_name='Outsider', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+        ProjectMember.objects.create(project=cls.project, user=cls.member, role='contributor')
+        ProjectInvitation.objects.create(project=cls.project, email='new@example.com', invited_by=cls.owner)
+        for i in range(5):
+            task = Task.objects.create(project=cls.project, title=f'Task {i}', description='', created_by=cls.owner)
+            if i % 2:
+                task.assigned_to.add(cls.owner, cls.member)
+
+    def setUp(self):
+        cache.clear()
+
+    def export(self, user, kind, fmt):
+        self.client.force_login(user)
+        return self.client.get(reverse('project:project_export', args=[self.project.pk, kind, fmt]))
+
+    def test_every_kind_and_format(self):
+        expected = {'members': 2, 'invitations': 1, 'tasks': 5}
+        for kind, count in expected.items():
+            for fmt, content_type in (('csv', 'text/csv'), ('jsonl', 'application/x-ndjson')):
+                with self.subTest(kind=kind, fmt=fmt):
+                    response = self.export(self.owner, kind, fmt)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(response.streaming)
+                    self.assertEqual(response['Content-Type'], content_type)
+                    self.assertEqual(
+                        response['Content-Disposition'],
+                        f'attachment; filename="project-{self.project.pk}-{kind}.{fmt}"',
+                    )
+                    lines = b''.join(response.streaming_content).decode().splitlines()
+                    self.assertEqual(len(lines), count + (fmt == 'csv'))
+
+    def test_rows(self):
+        response = self.export(self.owner, 'invitations', 'jsonl')
+        [row] = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual((row['email'], row['status'], row['invited_by']), ('new@example.com', 'pending', 'owner@example.com'))
+
+        response = self.export(self.owner, 'tasks', 'csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[1]['assigned_to'], 'owner@example.com;member@example.com')
+        self.assertEqual(rows[0]['assigned_to'], '')
+
+    def test_contributors_only_export_tasks(self):
+        self.assertEqual(self.export(self.member, 'tasks', 'csv').status_code, 200)
+        self.assertEqual(self.export(self.member, 'members', 'csv').status_code, 403)
+        self.assertEqual(self.export(self.member, 'invitations', 'jsonl').status_code, 403)
+
+    def test_outsiders_and_unknown_exports(self):
+        self.assertEqual(self.export(self.outsider, 'tasks', 'csv').status_code, 403)
+        self.assertEqual(self.export(self.owner, 'secrets', 'csv').status_code, 404)
+        self.assertEqual(self.export(self.owner, 'tasks', 'xml').status_code, 404)
+
+    def test_export_streams_in_chunks(self):
+        # Nothing is read until the first line is asked for
+        with self.assertNumQueries(0):
+            lines = export_lines(self.project.pk, 'tasks', 'jsonl', chunk_size=2)
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['title'] for row in rows], [f'Task {i}' for i in range(5)])
+        self.assertEqual([len(row['assigned_to']) for row in rows], [0, 2, 0, 2, 0])
+
+
+class RecordingBroker:
+    """
+    Broker for tests that keeps every published event.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def publish(self, channel, event):
+        self.events.append((channel, event))
+
+
+class InProcessBrokerTests(SimpleTestCase):
+    async def test_delivers_events_published_from_other_threads(self):
+        broker = InProcessBroker()
+        async with broker.subscribe('project:1') as subscription:
+            publish = sync_to_async(broker.publish, thread_sensitive=False)
+            await publish('project:2', {'type': 'task.deleted', 'data': {'id': 1}})
+            await publish('project:1', {'type': 'task.deleted', 'data': {'id': 2}})
+            event = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(event, {'type': 'task.deleted', 'data': {'id': 2}, 'id': 2})
+        self.assertEqual(broker.subscriptions, {})
+
+    async def test_slow_subscriber_gets_a_reset(self):
+        broker = InProcessBroker(queue_size=2)
+        async with broker.subscribe('project:1') as subscription:
+            for task_id in range(3):
+                broker.publish('project:1', {'type': 'task.deleted', 'data': {'id': task_id}})
+            await asyncio.sleep(0)
+            event = await asyncio.wait_for(subscription.get(), 1)
+        self.assertEqual(event['type'], 'reset')
+
+
+@override_settings(PROJECT_EVENTS_BROKER='project.tests.RecordingBroker')
+class ProjectEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'password', first_name='Owner', last_name='User', is_active=True)
+        cls.member = User.objects.create_user('member@example.com', 'password', first_name='Member', last_name='User', is_active=True)
+        cls.outsider = User.objects.create_user('outsider@example.com', 'password', first_name='Outsider', last_name='User', is_active=True)
+        cls.project = Project.objects.create(name='Apollo', description='', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+
+    def setUp(self):
+        cache.clear()
+        get_broker().events.clear()
+
+    def test_membership_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            membership = ProjectMember.objects.create(project=self.project, user=self.member, role='contributor')
+            self.assertEqual(get_broker().events, [])
+        membership_id = membership.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            membership.delete()
+        self.assertEqual(get_broker().events, [
+            (project_channel(self.project.pk), {
+                'type': 'member.added',
+                'data': {'id': membership_id, 'user': self.member.pk, 'role': 'contributor'},
+            }),
+            (project_channel(self.project.pk), {
+                'type': 'member.removed',
+                'data': {'id': membership_id, 'user': self.member.pk},
+            }),
+        ])
+
+    def test_stream_is_not_served_over_wsgi(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('project:project_events', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 501)
+
+    async def test_stream_requires_membership(self):
+        await sync_to_async(self.async_client.force_login)(self.outsider)
+        response = await self.async_client.get(reverse('project:project_events', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 403)
+
+
+class ProjectEventStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.com', 'password', first_name='Owner', last_name='User', is_active=True)
+        cls.project = Project.objects.create(name='Apollo', description='', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+
+    async def test_stream_sends_published_events(self):
+        await sync_to_async(self.async_client.force_login)(self.owner)
+        response = await self.async_client.get(reverse('project:project_events', args=[self.project.pk]))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 3000\n\n')
+        # The subscription is opened when the first chunk is read past the retry line.
+        next_chunk = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0.01)
+        get_broker().publish(project_channel(self.project.pk), {'type': 'task.deleted', 'data': {'id': 7}})
+        chunk = await asyncio.wait_for(next_chunk, 1)
+        self.assertIn(b'event: task.deleted\ndata: {"id":7}\n\n', chunk)
+        # Closing the bytes wrapper leaves the view's generator open until garbage
+        # collection, which can come after this test's event loop has closed.
+        await chunks.aclose()
+        await response._iterator.aclose()
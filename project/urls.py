@@ -10,6 +10,9 @@ urlpatterns = [
     path('<int:pk>/', views.project_detail, name='project_detail'),
     path('<int:pk>/update/', views.project_update, name='project_update'),
     path('<int:pk>/invite/', views.project_invite, name='project_invite'),
+    path('<int:pk>/invite/bulk/', views.project_bulk_invite, name='project_bulk_invite'),
+    path('<int:pk>/events/', views.project_events, name='project_events'),
+    path('<int:pk>/export/<slug:kind>.<slug:fmt>', views.project_export, name='project_export'),
     path('invite/accept/<uuid:token>/', views.accept_project_invite, name='accept_project_invite'),
     path('member/<int:pk>/remove/', views.project_member_remove, name='project_member_remove')
 ]
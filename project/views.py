@@ -1,16 +1,31 @@
+import asyncio
 import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.urls import reverse
 from django.db import IntegrityError
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied 
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import condition
+
+from core.auth import async_login_required
+from core.routers import replica_reads
 
 from .models import Project, ProjectMember, ProjectInvitation
-from .forms import InviteForm, ProjectForm, ProjectMemberForm, AddMemberByEmailForm
+from .forms import InviteForm, BulkInviteForm, ProjectForm, ProjectMemberForm, AddMemberByEmailForm
+from .services import bulk_invite
+from .permissions import get_project_role, project_access_required
+from .conditional import (
+    project_etag, project_last_modified, project_list_etag, project_list_last_modified, project_list_page,
+)
+from .dashboard import aget_dashboard_stats
+from .events import format_event, get_broker, project_channel
+from .exports import CREATOR_ONLY_EXPORTS, EXPORTS, FORMATS, export_lines
+from mailer.services import aenqueue_mail, enqueue_mail
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -19,17 +34,23 @@ logger = logging.getLogger(__name__)
 
 
 @login_required
+@replica_reads
+@condition(etag_func=project_list_etag, last_modified_func=project_list_last_modified)
 def project_list(request):
     """
     View to list all projects created by or contributed to by the logged-in user.
+    Creators are always members, so a single membership join covers both cases.
+    The list is paginated by keyset on (updated_at, id) using the ?cursor= token.
     """
-    user_projects = Project.objects.filter(created_by=request.user) | \
-                    Project.objects.filter(memberships__user=request.user)
-                    
-    user_projects = user_projects.distinct()
+    page = project_list_page(request)
+    if page is None:
+        return redirect('project:project_list')
+    projects, next_cursor = page
 
     context = {
-        'projects': user_projects
+        'projects': projects,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
     }
     return render(request, 'projects/project_list.html', context)
 
@@ -59,13 +80,14 @@ def project_create(request):
 
 
 @login_required
+@project_access_required()
+@condition(etag_func=project_etag, last_modified_func=project_last_modified)
 def project_detail(request, pk):
     """
     View to display details of a specific project.
+    GETs are answered with 304 while the project's version is unchanged.
     """
-    project = get_object_or_404(Project, pk=pk)
-    if not project.memberships.filter(user=request.user).exists():
-        raise PermissionDenied("You do not have permission to view this project.")
+    project = get_object_or_404(Project.objects.select_related('created_by'), pk=pk)
 
     add_member_form = AddMemberByEmailForm()
     invite_form = InviteForm()
@@ -101,7 +123,6 @@ def project_detail(request, pk):
              invite_form.project = project 
              if invite_form.is_valid():
                  invite_email = invite_form.cleaned_data['email']
-                 invite_role = invite_form.cleaned_data.get('role', 'contributor')
 
                  if project.memberships.filter(user__email=invite_email).exists():
                      invite_form.add_error('email', f"A user with this email is already a member of {project.name}.")
@@ -121,8 +142,7 @@ def project_detail(request, pk):
                              project=project,
                              user=invited_user,
                              email=invite_email if not invited_user else None,
-                             invited_by=request.user,
-                             role=invite_role
+                             invited_by=request.user
                          )
 
                          # Send the invitation email
@@ -147,16 +167,16 @@ def project_detail(request, pk):
                          recipient_list = [invite_email]
 
                          try:
-                             send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-                             logger.info(f"Project invitation sent to {invite_email} for project {project.name}")
+                             enqueue_mail(subject, message, from_email, recipient_list)
+                             logger.info(f"Project invitation queued for {invite_email} for project {project.name}")
                              return redirect('project:project_detail', pk=project.pk)
                          except Exception as e:
-                             logger.error(f"Error sending project invitation email to {invite_email}: {e}")
+                             logger.error(f"Error queueing project invitation email to {invite_email}: {e}")
                              invite_form.add_error(None, "Failed to send invitation email. Please try again.")
         else:
             logger.warning("Unknown form submission in project_detail view.")
          
-    members = project.memberships.all()
+    members = project.memberships.select_related('user')
 
     context = {
         'project': project,
@@ -168,6 +188,7 @@ def project_detail(request, pk):
 
 
 @login_required
+@project_access_required(role='creator')
 def project_update(request, pk):
     """
     View to update an existing project.
@@ -175,14 +196,11 @@ def project_update(request, pk):
     """
     project = get_object_or_404(Project, pk=pk)
 
-    if project.created_by != request.user:
-        raise PermissionDenied("You do not have permission to update this project.")
-
     if request.method == 'POST':
         form = ProjectForm(request.POST, instance=project)
         if form.is_valid():
             form.save()
-            return redirect('project_detail', pk=project.pk)
+            return redirect('project:project_detail', pk=project.pk)
     else:
         form = ProjectForm(instance=project)
 
@@ -193,74 +211,71 @@ def project_update(request, pk):
     return render(request, 'projects/project_update.html', context)
 
 
-@transaction.atomic
-@login_required
-def project_invite(request, pk):
+@async_login_required
+@project_access_required(role='creator')
+async def project_invite(request, pk):
     """
     View to send an invitation to a user to join a project.
     Only project admins are allowed to invite.
+    Async, so a slow database does not hold a worker thread for the whole request.
     """
-    project = get_object_or_404(Project, pk=pk)
-    if not project.memberships.filter(user=request.user).exists():
-         raise PermissionDenied("You do not have permission to invite members to this project.")
-    if project.created_by != request.user:
-        raise PermissionDenied("You do not have permission to invite members to this project.")
+    try:
+        project = await Project.objects.aget(pk=pk)
+    except Project.DoesNotExist:
+        raise Http404("No Project matches the given query.")
 
     if request.method == 'POST':
         form = InviteForm(request.POST)
         if form.is_valid():
             invite_email = form.cleaned_data['email']
-            invite_role = form.cleaned_data.get('role', 'contributor')
 
-            if project.memberships.filter(user__email=invite_email).exists():
+            if await project.memberships.filter(user__email=invite_email).aexists():
                 form.add_error('email', f"A user with this email is already a member of {project.name}.")
+            elif await ProjectInvitation.objects.filter(
+                project=project,
+                email=invite_email,
+                status='pending'
+            ).aexists():
+                form.add_error('email', f"An invitation has already been sent to {invite_email} for this project.")
             else:
-                existing_invitation = ProjectInvitation.objects.filter(
+                invited_user = await User.objects.filter(email=invite_email).afirst()
+
+                # Create the invitation
+                invitation = await ProjectInvitation.objects.acreate(
                     project=project,
-                    email=invite_email,
-                    status='pending'
-                ).first()
-                if existing_invitation:
-                     form.add_error('email', f"An invitation has already been sent to {invite_email} for this project.")
-                else:
-                    invited_user = User.objects.filter(email=invite_email).first()
-
-                    # Create the invitation
-                    invitation = ProjectInvitation.objects.create(
-                        project=project,
-                        user=invited_user,
-                        email=invite_email if not invited_user else None,
-                        invited_by=request.user
-                    )
-                    
-                    subject = f'Invitation to join project: {project.name}'
-                    invite_link = request.build_absolute_uri(reverse('project:accept_project_invite', args=[invitation.token]))
+                    user=invited_user,
+                    email=invite_email if not invited_user else None,
+                    invited_by=request.user
+                )
 
-                    message = f"""
-                    Hi,
+                subject = f'Invitation to join project: {project.name}'
+                invite_link = request.build_absolute_uri(reverse('project:accept_project_invite', args=[invitation.token]))
 
-                    You've been invited by {request.user.get_full_name()} to join the project "{project.name}".
+                message = f"""
+                Hi,
 
-                    Project Description: {project.description}
+                You've been invited by {request.user.get_full_name()} to join the project "{project.name}".
 
-                    To accept the invitation, click on the link below:
-                    {invite_link}
+                Project Description: {project.description}
 
-                    If you did not expect this invitation, please ignore this email.
+                To accept the invitation, click on the link below:
+                {invite_link}
 
-                    The Team
-                    """
-                    from_email = settings.DEFAULT_FROM_EMAIL
-                    recipient_list = [invite_email]
+                If you did not expect this invitation, please ignore this email.
 
-                    try:
-                        send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-                        logger.info(f"Project invitation sent to {invite_email} for project {project.name}")
-                        return redirect('project:project_detail', pk=project.pk)
-                    except Exception as e:
-                        logger.error(f"Error sending project invitation email to {invite_email}: {e}")
-                        invitation.delete()
-                        form.add_error(None, "Failed to send invitation email. Please try again.")
+                The Team
+                """
+                from_email = settings.DEFAULT_FROM_EMAIL
+                recipient_list = [invite_email]
+
+                try:
+                    await aenqueue_mail(subject, message, from_email, recipient_list)
+                    logger.info(f"Project invitation queued for {invite_email} for project {project.name}")
+                    return redirect('project:project_detail', pk=project.pk)
+                except Exception as e:
+                    logger.error(f"Error queueing project invitation email to {invite_email}: {e}")
+                    await invitation.adelete()
+                    form.add_error(None, "Failed to send invitation email. Please try again.")
 
     else:
         form = InviteForm()
@@ -272,6 +287,40 @@ def project_invite(request, pk):
     return render(request, 'projects/project_invite.html', context)
 
 
+@transaction.atomic
+@login_required
+@project_access_required(role='creator')
+def project_bulk_invite(request, pk):
+    """
+    View to invite a list of email addresses (pasted or uploaded as CSV) to a project.
+    Only the project creator is allowed to invite.
+    """
+    project = get_object_or_404(Project, pk=pk)
+
+    results = None
+    if request.method == 'POST':
+        form = BulkInviteForm(request.POST, request.FILES)
+        if form.is_valid():
+            results = bulk_invite(
+                project,
+                form.cleaned_data['email_list'],
+                request.user,
+                lambda invitation: request.build_absolute_uri(
+                    reverse('project:accept_project_invite', args=[invitation.token])
+                ),
+            )
+            form = BulkInviteForm()
+    else:
+        form = BulkInviteForm()
+
+    context = {
+        'project': project,
+        'form': form,
+        'results': results,
+    }
+    return render(request, 'projects/project_bulk_invite.html', context)
+
+
 @transaction.atomic
 def accept_project_invite(request, token):
     """
@@ -281,7 +330,7 @@ def accept_project_invite(request, token):
     invitation = get_object_or_404(ProjectInvitation, token=token, status='pending')
 
     # Check if the invitation has expired
-    if invitation.is_expired(): 
+    if invitation.has_expired():
         invitation.status = 'expired'
         invitation.save()
         return render(request, 'projects/invite_expired.html', {'invitation': invitation})
@@ -294,14 +343,14 @@ def accept_project_invite(request, token):
             # pass
 
         # If the invitation is by email and the logged-in user's email matches
-        if invitation.email and invitation.email != request.user.email:
+        if invitation.email and invitation.email.lower() != request.user.email.lower():
              # Logged-in user's email doesn't match the invited email
              logger.warning(f"Authenticated user {request.user.email} attempted to accept invitation for email {invitation.email}")
              return redirect('accounts:login')
 
         # If the user is logged in and matches the invitation criteria (user or email)
         try:
-            if not ProjectMember.objects.filter(project=invitation.project, user=request.user).exists():
+            if get_project_role(request.user, invitation.project_id) is None:
                  ProjectMember.objects.create(
                      project=invitation.project,
                      user=request.user,
@@ -314,17 +363,19 @@ def accept_project_invite(request, token):
             invitation.status = 'accepted'
             invitation.accepted_at = timezone.now()
             invitation.user = request.user
+            invitation.email = None  # an invitation names either a user or an email
             invitation.save()
 
-            return redirect('project_detail', pk=invitation.project.pk)
+            return redirect('project:project_detail', pk=invitation.project.pk)
 
         except IntegrityError:
             logger.warning(f"IntegrityError when adding user {request.user.email} to project {invitation.project.name}. User is likely already a member.")
             invitation.status = 'accepted'
             invitation.accepted_at = timezone.now()
             invitation.user = request.user
+            invitation.email = None  # an invitation names either a user or an email
             invitation.save()
-            return redirect('project_detail', pk=invitation.project.pk)
+            return redirect('project:project_detail', pk=invitation.project.pk)
 
     else:
         request.session['invitation_token'] = str(token)
@@ -337,10 +388,10 @@ def project_member_remove(request, pk):
     """
     View to remove a member from a project wth permission checks
     """
-    member_to_remove = get_object_or_404(ProjectMember, pk=pk)
+    member_to_remove = get_object_or_404(ProjectMember.objects.select_related('project', 'user'), pk=pk)
     project = member_to_remove.project
-    
-    if project.created_by == request.user and member_to_remove.user != request.user:
+
+    if get_project_role(request.user, project.pk) == 'creator' and member_to_remove.user_id != request.user.pk:
         member_to_remove.delete()
         logger.info(f"User {request.user.email} removed member {member_to_remove.user.email} from project {project.name}")
     else:
@@ -349,5 +400,68 @@ def project_member_remove(request, pk):
     return redirect('project:project_detail', pk=project.pk)
 
 @login_required
-def dashboard(request):
-    return render(request, "projects/dashboard.html")
\ No newline at end of file
+@project_access_required()
+@replica_reads
+def project_export(request, pk, kind, fmt):
+    """
+    Streams a project's members, invitations or tasks as CSV or JSON Lines.
+    Members and invitations list email addresses, so only the creator gets those.
+    """
+    if kind not in EXPORTS or fmt not in FORMATS:
+        raise Http404("Unknown export.")
+    if kind in CREATOR_ONLY_EXPORTS and request.project_role != 'creator':
+        raise PermissionDenied("Only the project creator can export members and invitations.")
+
+    response = StreamingHttpResponse(export_lines(pk, kind, fmt), content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="project-{pk}-{kind}.{fmt}"'
+    return response
+
+
+EVENT_STREAM_HEARTBEAT_SECONDS = 15
+
+
+@async_login_required
+@project_access_required()
+async def project_events(request, pk):
+    """
+    Server-Sent Events stream of changes to a project (tasks and members), so open
+    task boards can apply them instead of polling.
+    The stream closes after settings.PROJECT_EVENTS_STREAM_SECONDS and the browser
+    reconnects, which bounds how long a stream outlives a dropped client or a
+    revoked membership.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be held for the life of the stream.
+        return HttpResponse("Event streams are only served by the ASGI application.", status=501)
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.PROJECT_EVENTS_STREAM_SECONDS
+        yield 'retry: 3000\n\n'
+        async with get_broker().subscribe(project_channel(pk)) as subscription:
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), min(EVENT_STREAM_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection.
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_event(event)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@async_login_required
+async def dashboard(request):
+    """
+    Landing page after login showing the user's project, task and invitation counters.
+    """
+    context = {
+        'stats': await aget_dashboard_stats(request.user),
+    }
+    return render(request, "projects/dashboard.html", context)
\ No newline at end of file
@@ -0,0 +1,122 @@
+import re
+
+from django.db import connection, connections, router, transaction
+
+from project.models import Project
+from task.models import Task
+from .models import SearchDocument
+
+FTS_TABLE = 'search_searchdocument_fts'
+
+
+def _document_fields(kind, obj):
+    if kind == 'project':
+        return {'project_id': obj.pk, 'title': obj.name, 'body': obj.description}
+    return {'project_id': obj.project_id, 'title': obj.title, 'body': obj.description}
+
+
+def index_objects(kind, objs):
+    """
+    Adds or refreshes the search documents for projects or tasks with a single
+    INSERT ... ON CONFLICT DO UPDATE statement.
+    """
+    SearchDocument.objects.bulk_create(
+        [SearchDocument(kind=kind, object_id=obj.pk, **_document_fields(kind, obj)) for obj in objs],
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['project', 'title', 'body'],
+    )
+
+
+def index_object(kind, obj):
+    index_objects(kind, [obj])
+
+
+def remove_object(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def rebuild_index(chunk_size=2000):
+    """
+    Recreates every search document from the Project and Task tables.
+    Returns the number of documents indexed.
+    """
+    total = 0
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        sources = [
+            ('project', Project.objects.values_list('id', 'id', 'name', 'description')),
+            ('task', Task.objects.values_list('id', 'project_id', 'title', 'description')),
+        ]
+        for kind, rows in sources:
+            batch = []
+            for object_id, project_id, title, body in rows.order_by('id').iterator(chunk_size=chunk_size):
+                batch.append(SearchDocument(
+                    kind=kind, object_id=object_id, project_id=project_id, title=title, body=body
+                ))
+                if len(batch) >= chunk_size:
+                    SearchDocument.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            SearchDocument.objects.bulk_create(batch)
+            total += len(batch)
+
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return total
+
+
+def _fts5_query(query):
+    """
+    Turns free text into an FTS5 expression: every word is quoted and prefix matched,
+    so user input can never be parsed as FTS5 syntax.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def search(user, query, limit=50):
+    """
+    Returns ranked search hits among the projects `user` is a member of, as dicts
+    with kind, object_id, project_id, title and body keys, best match first.
+    """
+    columns = ['kind', 'object_id', 'project_id', 'title', 'body']
+    # Raw SQL skips the database routers, so ask them which connection to read from.
+    connection = connections[router.db_for_read(SearchDocument)]
+
+    if connection.vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return []
+        sql = f"""
+            SELECT d.kind, d.object_id, d.project_id, d.title, d.body
+            FROM {FTS_TABLE} f
+            JOIN search_searchdocument d ON d.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s
+              AND d.project_id IN (SELECT project_id FROM project_projectmember WHERE user_id = %s)
+            ORDER BY bm25({FTS_TABLE}, 10.0, 1.0)
+            LIMIT %s
+        """
+        params = [match, user.pk, limit]
+    elif connection.vendor == 'postgresql':
+        if not query.strip():
+            return []
+        sql = """
+            SELECT d.kind, d.object_id, d.project_id, d.title, d.body
+            FROM search_searchdocument d, websearch_to_tsquery('english', %s) q
+            WHERE d.search_vector @@ q
+              AND d.project_id IN (SELECT project_id FROM project_projectmember WHERE user_id = %s)
+            ORDER BY ts_rank(d.search_vector, q) DESC
+            LIMIT %s
+        """
+        params = [query, user.pk, limit]
+    else:
+        # No full-text support on this backend: fall back to a substring scan.
+        return list(
+            SearchDocument.objects.filter(project__memberships__user=user, title__icontains=query)
+            .values(*columns)[:limit]
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
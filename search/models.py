@@ -0,0 +1,27 @@
+from django.db import models
+
+from project.models import Project
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable row per project or task. The full-text index itself lives outside
+    the ORM: an FTS5 table on SQLite, or a generated tsvector column on Postgres,
+    both created by this app's migrations and kept in sync by the database.
+    """
+    KIND_CHOICES = [
+        ('project', 'Project'),
+        ('task', 'Task'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
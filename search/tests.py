@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from project.models import Project, ProjectMember
+from task.models import Task
+from .index import rebuild_index
+from .models import SearchDocument
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.outsider = User.objects.create_user(
+            'outsider@example.com', 'password', first_name='Otto', last_name='Outsider', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='Moon landing', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+        cls.hidden = Project.objects.create(name='Secret rocket', description='', created_by=cls.outsider)
+        ProjectMember.objects.create(project=cls.hidden, user=cls.outsider, role='creator')
+
+    def setUp(self):
+        self.client.force_login(self.owner)
+
+    def search(self, query):
+        response = self.client.get(reverse('search:search_json'), {'q': query})
+        return [(hit['kind'], hit['title']) for hit in response.json()['results']]
+
+    def test_ranks_title_matches_first_and_hides_other_projects(self):
+        Task.objects.create(project=self.project, title='Fuel check', description='rocket stage', created_by=self.owner)
+        Task.objects.create(project=self.project, title='Build the rocket', description='', created_by=self.owner)
+        self.assertEqual(self.search('rocket'), [('task', 'Build the rocket'), ('task', 'Fuel check')])
+
+    def test_documents_follow_saves_and_deletes(self):
+        task = Task.objects.create(project=self.project, title='Train astronauts', created_by=self.owner)
+        task.title = 'Train pilots'
+        task.save()
+        self.assertEqual(self.search('pilot'), [('task', 'Train pilots')])
+        self.assertEqual(self.search('astronauts'), [])
+        task.delete()
+        self.assertEqual(self.search('pilot'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('"moon* ('), [('project', 'Apollo')])
+
+    def test_rebuild_index(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(rebuild_index(), 2)
+        self.assertEqual(self.search('moon'), [('project', 'Apollo')])
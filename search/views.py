@@ -0,0 +1,36 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from core.routers import replica_reads
+
+from .index import search
+
+SEARCH_RESULT_LIMIT = 50
+
+
+@login_required
+@replica_reads
+def search_view(request):
+    """
+    View to search the projects and tasks the logged-in user has access to.
+    """
+    query = request.GET.get('q', '').strip()
+    results = search(request.user, query, limit=SEARCH_RESULT_LIMIT) if query else []
+
+    context = {
+        'query': query,
+        'results': results,
+    }
+    return render(request, 'search/results.html', context)
+
+
+@login_required
+@replica_reads
+def search_json(request):
+    """
+    JSON version of search_view.
+    """
+    query = request.GET.get('q', '').strip()
+    results = search(request.user, query, limit=SEARCH_RESULT_LIMIT) if query else []
+    return JsonResponse({'query': query, 'results': results})
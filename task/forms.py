@@ -1,5 +1,8 @@
+import csv
+import io
 from django import forms
-from .models import Task, ProjectMember
+from .models import Task
+from project.models import ProjectMember
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 
@@ -60,7 +63,7 @@ class TaskForm(forms.ModelForm):
         assigned_users = self.cleaned_data.get('assigned_to')
 
         if assigned_users and self.project:
-            project_member_ids = ProjectMember.objects.filter(project=self.project).values_list('user__id', flat=True)
+            project_member_ids = set(ProjectMember.objects.filter(project=self.project).values_list('user_id', flat=True))
 
             for user in assigned_users:
                 if user.id not in project_member_ids:
@@ -71,3 +74,40 @@ class TaskForm(forms.ModelForm):
 
         return assigned_users
 
+
+class TaskImportForm(forms.Form):
+    """
+    Form for uploading a CSV file of tasks to import into a project.
+    """
+    csv_file = forms.FileField(
+        label='CSV File',
+        help_text='Columns: title, description, status, assigned_to (member emails separated by ";").',
+        widget=forms.ClearableFileInput(
+            attrs={
+                'class': 'w-full text-sm text-gray-700 dark:text-gray-300',
+                'accept': '.csv,text/csv'
+            }
+        )
+    )
+    dry_run = forms.BooleanField(
+        label='Dry run (validate only)',
+        required=False,
+        widget=forms.CheckboxInput(
+            attrs={
+                'class': 'h-4 w-4 text-primary-600 focus:ring-primary-500 border-gray-300 rounded dark:bg-gray-700 dark:border-gray-600'
+            }
+        )
+    )
+
+    def clean_csv_file(self):
+        csv_file = self.cleaned_data['csv_file']
+        try:
+            content = csv_file.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValidationError("The CSV file must be UTF-8 encoded.")
+
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames or 'title' not in [name.strip().lower() for name in reader.fieldnames]:
+            raise ValidationError("The CSV file must have a header row with at least a 'title' column.")
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        return reader
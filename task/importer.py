@@ -0,0 +1,118 @@
+import re
+from itertools import islice
+
+from django.db import transaction
+
+from project.dashboard import invalidate_project_dashboards
+from project.events import publish_project_event
+from project.models import Project, ProjectMember
+from search.index import index_objects
+from .models import Task
+
+CHUNK_SIZE = 1000
+
+STATUSES = {status for status, _ in Task.STATUS_CHOICES}
+STATUS_LABELS = {label.lower(): status for status, label in Task.STATUS_CHOICES}
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+
+
+def _split_emails(value):
+    return [email for email in re.split(r'[\s,;]+', value or '') if email]
+
+
+def _build_task(project, created_by, row, member_ids):
+    """
+    Validates one import row. Returns (task, assignee_ids) or raises ValueError.
+    """
+    title = (row.get('title') or '').strip()
+    if not title:
+        raise ValueError("Title is required.")
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f"Title is longer than {TITLE_MAX_LENGTH} characters.")
+
+    status = (row.get('status') or 'todo').strip().lower()
+    status = STATUS_LABELS.get(status, status)
+    if status not in STATUSES:
+        raise ValueError(f"Unknown status '{row.get('status')}'.")
+
+    assignee_ids = []
+    for email in _split_emails(row.get('assigned_to')):
+        user_id = member_ids.get(email.lower())
+        if user_id is None:
+            raise ValueError(f"{email} is not a member of this project.")
+        assignee_ids.append(user_id)
+
+    task = Task(
+        project=project,
+        title=title,
+        description=(row.get('description') or '').strip(),
+        status=status,
+        created_by=created_by,
+    )
+    return task, set(assignee_ids)
+
+
+def import_tasks(project, rows, created_by, chunk_size=CHUNK_SIZE, dry_run=False, progress=None):
+    """
+    Imports task rows (dicts with title, description, status and assigned_to keys)
+    into `project`.
+
+    Assignees are given as emails and checked against the project's members, which
+    are loaded once up front. Valid rows are inserted chunk by chunk with bulk_create,
+    together with their assigned_to through rows, one transaction per chunk. Invalid
+    rows are skipped and reported. With dry_run nothing is written and the counts
+    describe what would have been imported.
+
+    `progress` is called with the running totals after every chunk.
+    Returns a dict with 'rows', 'created', 'assignments' and 'errors', where errors
+    is a list of (row number, message) tuples.
+    """
+    member_ids = {
+        email.lower(): user_id
+        for email, user_id in ProjectMember.objects.filter(project=project).values_list('user__email', 'user_id')
+    }
+    through = Task.assigned_to.through
+    result = {'rows': 0, 'created': 0, 'assignments': 0, 'errors': []}
+    numbered = enumerate(rows, start=1)
+
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+
+        tasks = []
+        assignments = []
+        for number, row in chunk:
+            try:
+                task, assignee_ids = _build_task(project, created_by, row, member_ids)
+            except ValueError as e:
+                result['errors'].append((number, str(e)))
+                continue
+            tasks.append(task)
+            assignments.append(assignee_ids)
+
+        if not dry_run and tasks:
+            with transaction.atomic():
+                Task.objects.bulk_create(tasks)
+                through.objects.bulk_create([
+                    through(task_id=task.pk, user_id=user_id)
+                    for task, assignee_ids in zip(tasks, assignments)
+                    for user_id in assignee_ids
+                ])
+                index_objects('task', tasks)
+
+        result['rows'] += len(chunk)
+        result['created'] += len(tasks)
+        result['assignments'] += sum(len(assignee_ids) for assignee_ids in assignments)
+        if progress:
+            progress(result)
+
+    if not dry_run and result['created']:
+        # bulk_create skips the post_save handlers that keep dashboards fresh;
+        # the search documents were written alongside each chunk above.
+        invalidate_project_dashboards(project.pk)
+        Project.bump_version(project.pk)
+        # One event for the whole import rather than one per row.
+        publish_project_event(project.pk, 'tasks.imported', {'count': result['created']})
+
+    return result
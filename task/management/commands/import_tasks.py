@@ -0,0 +1,63 @@
+import csv
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from project.models import Project
+from task.importer import CHUNK_SIZE, import_tasks
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports tasks into a project from a CSV file with title, description, status and assigned_to columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('csv_path')
+        parser.add_argument('--created-by', help='Email of the user recorded as creator (default: the project creator).')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without writing anything.')
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.select_related('created_by').get(pk=options['project_id'])
+        except Project.DoesNotExist:
+            raise CommandError(f"Project {options['project_id']} does not exist.")
+
+        created_by = project.created_by
+        if options['created_by']:
+            try:
+                created_by = User.objects.get(email=options['created_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user found with email {options['created_by']}.")
+
+        started = time.monotonic()
+
+        def progress(result):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{result['rows']} rows processed, {result['created']} tasks, "
+                f"{len(result['errors'])} errors ({result['rows'] / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+
+        with open(options['csv_path'], newline='', encoding='utf-8-sig') as csv_file:
+            reader = csv.DictReader(csv_file)
+            if not reader.fieldnames or 'title' not in [name.strip().lower() for name in reader.fieldnames]:
+                raise CommandError("The CSV file must have a header row with at least a 'title' column.")
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+
+            result = import_tasks(
+                project, reader, created_by,
+                chunk_size=options['chunk_size'], dry_run=options['dry_run'], progress=progress
+            )
+
+        for number, message in result['errors']:
+            self.stderr.write(f"Row {number}: {message}")
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['created']} task(s) with {result['assignments']} assignment(s); "
+            f"{len(result['errors'])} row(s) skipped."
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', '-created_at', '-id'], name='task_project_status_idx'),
+        ),
+    ]
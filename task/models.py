@@ -1,6 +1,6 @@
 from django.db import models
 from django.conf import settings
-from ..project.models import Project
+from project.models import Project
 
 class Task(models.Model):
     STATUS_CHOICES = [
@@ -17,11 +17,41 @@ class Task(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='todo')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+
+    # Fields whose changes are pushed to open task boards as diffs
+    TRACKED_FIELDS = ('title', 'description', 'status')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def tracked_changes(self):
+        """
+        Returns {field: [old, new]} for tracked fields that differ from the values
+        last loaded or saved. Old values are None when they are unknown.
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        deferred = self.get_deferred_fields()
+        changes = {}
+        for name in self.TRACKED_FIELDS:
+            if name in deferred:
+                continue
+            value = getattr(self, name)
+            if name not in loaded or loaded[name] != value:
+                changes[name] = [loaded.get(name), value]
+        return changes
+
     def __str__(self):
-        return f"{self.title} assign to {self.assigned_to if self.assigned_to else 'No one'}"
+        return f"{self.title} ({self.get_status_display()})"
     
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Tasks'
-        verbose_name = 'Task'
\ No newline at end of file
+        verbose_name = 'Task'
+        indexes = [
+            models.Index(fields=['project', 'status', '-created_at', '-id'], name='task_project_status_idx'),
+        ]
\ No newline at end of file
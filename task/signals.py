@@ -0,0 +1,81 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from project.dashboard import invalidate_dashboard_stats, invalidate_project_dashboards
+from project.events import publish_project_event
+from project.models import Project
+from .models import Task
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    Project.bump_version(instance.project_id)
+    invalidate_project_dashboards(instance.project_id)
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, created, raw, update_fields, **kwargs):
+    if raw:
+        return
+    if created:
+        created_by = instance.created_by if Task.created_by.is_cached(instance) else None
+        publish_project_event(instance.project_id, 'task.created', {
+            'id': instance.pk,
+            'title': instance.title,
+            'description': instance.description,
+            'status': instance.status,
+            'created_at': instance.created_at,
+            'created_by': {
+                'id': instance.created_by_id,
+                'name': created_by.get_full_name() if created_by else None,
+            },
+        })
+    else:
+        changes = instance.tracked_changes()
+        if update_fields is not None:
+            changes = {name: change for name, change in changes.items() if name in update_fields}
+        if changes:
+            publish_project_event(instance.project_id, 'task.updated', {'id': instance.pk, 'changes': changes})
+    # The next save is diffed against what was just written.
+    deferred = instance.get_deferred_fields()
+    instance._loaded_values = {
+        name: getattr(instance, name) for name in Task.TRACKED_FIELDS if name not in deferred
+    }
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, **kwargs):
+    publish_project_event(instance.project_id, 'task.deleted', {'id': instance.pk, 'status': instance.status})
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def task_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # instance is the user whose assignments changed
+        invalidate_dashboard_stats([instance.pk])
+        if pk_set:
+            Project.bump_versions(Task.objects.filter(pk__in=pk_set).values('project_id'))
+            for task_id, project_id in Task.objects.filter(pk__in=pk_set).values_list('pk', 'project_id'):
+                publish_assignees_changed(project_id, task_id, action, [instance.pk])
+        return
+
+    Project.bump_version(instance.project_id)
+    publish_assignees_changed(instance.project_id, instance.pk, action, sorted(pk_set or ()))
+    if pk_set:
+        invalidate_dashboard_stats(pk_set)
+    else:
+        invalidate_project_dashboards(instance.project_id)
+
+
+ASSIGNEE_ACTIONS = {'post_add': 'added', 'post_remove': 'removed', 'post_clear': 'cleared'}
+
+
+def publish_assignees_changed(project_id, task_id, action, user_ids):
+    publish_project_event(project_id, 'task.assignees', {
+        'id': task_id,
+        'action': ASSIGNEE_ACTIONS[action],
+        'users': user_ids,
+    })
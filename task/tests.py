@@ -1,3 +1,255 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from project.events import get_broker
+from project.models import Project, ProjectMember
+from .importer import import_tasks
+from .models import Task
+
+User = get_user_model()
+
+
+class TaskViewQueryCountTests(TestCase):
+    """
+    Pins the number of queries each task view runs so N+1 regressions fail CI.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.member = User.objects.create_user(
+            'member@example.com', 'password', first_name='Mark', last_name='Member', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='Moon landing', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+        ProjectMember.objects.create(project=cls.project, user=cls.member, role='contributor')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+
+    def add_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                project=self.project,
+                title=f'Task {i}',
+                description='',
+                created_by=self.owner,
+                status=Task.STATUS_CHOICES[i % 3][0],
+            )
+            task.assigned_to.add(self.owner, self.member)
+
+    def test_task_board(self):
+        self.add_tasks(3)
+        with self.assertNumQueries(9):
+            response = self.client.get(reverse('task:task_board', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_task_board_not_modified(self):
+        url = reverse('task:task_board', args=[self.project.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.add_tasks(1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_task_board_does_not_grow_with_tasks(self):
+        self.add_tasks(30)
+        with self.assertNumQueries(9):
+            response = self.client.get(reverse('task:task_board', args=[self.project.pk]))
+        self.assertEqual([column['count'] for column in response.context['board']], [10, 10, 10])
+
+    def test_task_board_json_does_not_grow_with_tasks(self):
+        self.add_tasks(30)
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse('task:task_board_json', args=[self.project.pk]))
+        self.assertEqual(len(response.json()['columns']['todo']['tasks']), 10)
+
+    def test_create_task_get(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('task:create_task', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_task_post(self):
+        with self.assertNumQueries(13):
+            response = self.client.post(
+                reverse('task:create_task', args=[self.project.pk]),
+                {
+                    'title': 'Launch',
+                    'description': 'Lift off',
+                    'status': 'todo',
+                    'assigned_to': [self.owner.pk, self.member.pk],
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Task.objects.get(title='Launch').assigned_to.count(), 2)
+
+
+@override_settings(PROJECT_EVENTS_BROKER='project.tests.RecordingBroker')
+class TaskEventTests(TestCase):
+    """
+    Task signals publish compact diffs for open task boards.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='Moon landing', created_by=cls.owner)
+        cls.task = Task.objects.create(project=cls.project, title='Launch', description='', created_by=cls.owner)
+
+    def setUp(self):
+        get_broker().events.clear()
+
+    def published(self):
+        return [event for _, event in get_broker().events]
+
+    def test_create_publishes_the_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(project=self.project, title='Land', description='', created_by=self.owner)
+        [event] = self.published()
+        self.assertEqual(event['type'], 'task.created')
+        self.assertEqual(event['data']['id'], task.pk)
+        self.assertEqual(event['data']['created_by'], {'id': self.owner.pk, 'name': 'Olive Owner'})
+
+    def test_update_publishes_only_changed_fields(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.status = 'done'
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+            task.save()
+        self.assertEqual(self.published(), [
+            {'type': 'task.updated', 'data': {'id': task.pk, 'changes': {'status': ['todo', 'done']}}},
+        ])
+
+    def test_update_with_deferred_fields_diffs_loaded_fields_only(self):
+        task = Task.objects.only('status', 'project_id').get(pk=self.task.pk)
+        task.status = 'in_progress'
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save(update_fields=['status'])
+        self.assertEqual(self.published()[0]['data']['changes'], {'status': ['todo', 'in_progress']})
+
+    def test_delete_and_assignees_are_published(self):
+        task_id = self.task.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.assigned_to.add(self.owner)
+            self.task.delete()
+        self.assertEqual(self.published(), [
+            {'type': 'task.assignees', 'data': {'id': task_id, 'action': 'added', 'users': [self.owner.pk]}},
+            {'type': 'task.deleted', 'data': {'id': task_id, 'status': 'todo'}},
+        ])
+
+
+class TaskImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            'owner@example.com', 'password', first_name='Olive', last_name='Owner', is_active=True
+        )
+        cls.member = User.objects.create_user(
+            'member@example.com', 'password', first_name='Mark', last_name='Member', is_active=True
+        )
+        cls.project = Project.objects.create(name='Apollo', description='Moon landing', created_by=cls.owner)
+        ProjectMember.objects.create(project=cls.project, user=cls.owner, role='creator')
+        ProjectMember.objects.create(project=cls.project, user=cls.member, role='contributor')
+
+    def setUp(self):
+        cache.clear()
+
+    def rows(self, count):
+        return [
+            {'title': f'Task {i}', 'description': 'Imported', 'status': 'In Progress',
+             'assigned_to': 'owner@example.com; MEMBER@example.com'}
+            for i in range(count)
+        ]
+
+    def csv_file(self, count, extra=''):
+        lines = ['title,description,status,assigned_to']
+        lines += [f'Task {i},Imported,todo,member@example.com' for i in range(count)]
+        return SimpleUploadedFile('tasks.csv', ('\n'.join(lines) + '\n' + extra).encode(), content_type='text/csv')
+
+    def test_valid_rows(self):
+        result = import_tasks(self.project, self.rows(3), self.owner)
+        self.assertEqual(result, {'rows': 3, 'created': 3, 'assignments': 6, 'errors': []})
+        task = Task.objects.get(title='Task 1')
+        self.assertEqual((task.status, task.created_by, task.description), ('in_progress', self.owner, 'Imported'))
+        self.assertEqual(set(task.assigned_to.all()), {self.owner, self.member})
+
+    def test_bad_rows_are_skipped_and_reported(self):
+        rows = [
+            {'title': 'Good'},
+            {'title': '  '},
+            {'title': 'x' * 300},
+            {'title': 'Bad status', 'status': 'someday'},
+            {'title': 'Stranger', 'assigned_to': 'nobody@example.com'},
+        ]
+        result = import_tasks(self.project, rows, self.owner)
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([number for number, message in result['errors']], [2, 3, 4, 5])
+        self.assertEqual(result['errors'][3][1], 'nobody@example.com is not a member of this project.')
+        self.assertEqual(list(Task.objects.values_list('title', 'status')), [('Good', 'todo')])
+
+    def test_rows_are_inserted_in_chunks(self):
+        totals = []
+        result = import_tasks(
+            self.project, self.rows(5), self.owner, chunk_size=2,
+            progress=lambda result: totals.append(result['created']),
+        )
+        self.assertEqual(totals, [2, 4, 5])
+        self.assertEqual(result['assignments'], 10)
+        self.assertEqual(Task.assigned_to.through.objects.count(), 10)
+
+    def test_queries_grow_with_chunks_not_rows(self):
+        def queries(count):
+            with CaptureQueriesContext(connection) as captured, self.captureOnCommitCallbacks(execute=True):
+                import_tasks(self.project, self.rows(count), self.owner, chunk_size=100)
+            return len(captured)
+
+        self.assertEqual(queries(10), queries(50))
+
+    def test_dry_run_writes_nothing(self):
+        result = import_tasks(self.project, self.rows(3), self.owner, dry_run=True)
+        self.assertEqual(result['created'], 3)
+        self.assertFalse(Task.objects.exists())
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as f:
+            f.write('Title,Status,Assigned_To\nFirst,done,member@example.com\n,todo,\nSecond,,\n')
+        self.addCleanup(os.remove, f.name)
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_tasks', self.project.pk, f.name, chunk_size=1, stdout=out, stderr=err)
+        self.assertIn('Imported 2 task(s) with 1 assignment(s); 1 row(s) skipped.', out.getvalue())
+        self.assertEqual(err.getvalue(), 'Row 2: Title is required.\n')
+        self.assertEqual(set(Task.objects.values_list('title', 'status')), {('First', 'done'), ('Second', 'todo')})
+
+    def test_view_post(self):
+        self.client.force_login(self.owner)
+        url = reverse('task:import_tasks', args=[self.project.pk])
+        with self.assertNumQueries(11), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'csv_file': self.csv_file(20, 'Broken,,someday\n')})
+        self.assertEqual(response.context['result']['created'], 20)
+        self.assertEqual(response.context['result']['errors'], [(21, "Unknown status 'someday'.")])
+
+        with self.assertNumQueries(11), self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'csv_file': self.csv_file(200)})
+        self.assertEqual(Task.objects.count(), 220)
+
+    def test_view_is_for_the_creator(self):
+        self.client.force_login(self.member)
+        response = self.client.post(reverse('task:import_tasks', args=[self.project.pk]), {'csv_file': self.csv_file(1)})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Task.objects.exists())
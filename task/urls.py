@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'task'
+
+urlpatterns = [
+    path('project/<int:project_id>/', views.task_board, name='task_board'),
+    path('project/<int:project_id>/board.json', views.task_board_json, name='task_board_json'),
+    path('project/<int:project_id>/create/', views.create_task, name='create_task'),
+    path('project/<int:project_id>/import/', views.import_tasks_view, name='import_tasks'),
+]
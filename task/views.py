@@ -1,34 +1,186 @@
-from django.shortcuts import redirect, render
-from ..users.models import Users
-from ..project.models import Project
+from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import PermissionDenied
-from .forms import TaskForm
+from django.db.models import Count, Q, prefetch_related_objects
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import condition
+
+from core.pagination import InvalidCursor, keyset_paginate
+from project.conditional import project_etag, project_last_modified
+from project.models import Project
+from project.permissions import project_access_required
+from .forms import TaskForm, TaskImportForm
+from .importer import import_tasks
+from .models import Task
+
+TASK_COLUMN_PAGE_SIZE = 25
+
+STATUSES = [status for status, _ in Task.STATUS_CHOICES]
+
+
+def _board_columns(project, cursors, statuses=STATUSES):
+    """
+    Returns one page of tasks per status column, keyed by status.
+    Each column is paged independently with its own keyset cursor; assignees
+    for every column are loaded with a single prefetch query.
+    """
+    tasks = Task.objects.filter(project=project).select_related('created_by')
+    columns = {}
+    for status in statuses:
+        rows, next_cursor = keyset_paginate(
+            tasks.filter(status=status), ['-created_at', '-id'],
+            cursor=cursors.get(status), page_size=TASK_COLUMN_PAGE_SIZE
+        )
+        columns[status] = {'tasks': rows, 'next_cursor': next_cursor}
+
+    prefetch_related_objects(
+        [task for column in columns.values() for task in column['tasks']],
+        'assigned_to'
+    )
+    return columns
+
+
+def _status_counts(project):
+    """
+    Returns the number of tasks per status with one aggregate query.
+    """
+    return Task.objects.filter(project=project).aggregate(**{
+        status: Count('id', filter=Q(status=status)) for status in STATUSES
+    })
+
+
+@login_required
+@project_access_required(project_kwarg='project_id')
+@condition(etag_func=project_etag, last_modified_func=project_last_modified)
+def task_board(request, project_id):
+    """
+    View to display a project's tasks as a board grouped by status.
+    Every column is paginated on its own through the ?<status>_cursor= parameter.
+    """
+    project = get_object_or_404(Project, pk=project_id)
+    cursors = {status: request.GET.get(f'{status}_cursor') for status in STATUSES}
+
+    try:
+        columns = _board_columns(project, cursors)
+    except InvalidCursor:
+        return redirect('task:task_board', project_id=project_id)
+
+    counts = _status_counts(project)
+    board = [
+        {
+            'status': status,
+            'label': label,
+            'count': counts[status],
+            'tasks': columns[status]['tasks'],
+            'next_cursor': columns[status]['next_cursor'],
+        }
+        for status, label in Task.STATUS_CHOICES
+    ]
+
+    context = {
+        'project': project,
+        'board': board,
+    }
+    return render(request, 'tasks/task_board.html', context)
+
+
+def _serialize_task(task):
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'description': task.description,
+        'status': task.status,
+        'created_at': task.created_at.isoformat(),
+        'updated_at': task.updated_at.isoformat(),
+        'created_by': {'id': task.created_by_id, 'name': task.created_by.get_full_name()},
+        'assigned_to': [
+            {'id': user.pk, 'name': user.get_full_name()} for user in task.assigned_to.all()
+        ],
+    }
 
-# Create your views here.
 
 @login_required
+@project_access_required(project_kwarg='project_id')
+@condition(etag_func=project_etag, last_modified_func=project_last_modified)
+def task_board_json(request, project_id):
+    """
+    JSON version of the task board.
+    With ?status=<status>&cursor=<token> only the next page of that column is returned.
+    """
+    status = request.GET.get('status')
+    if status is not None and status not in STATUSES:
+        raise Http404("Unknown task status.")
+
+    statuses = [status] if status else STATUSES
+    cursors = {status: request.GET.get('cursor')} if status else {}
+
+    try:
+        columns = _board_columns(project_id, cursors, statuses)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+    data = {
+        'project': project_id,
+        'counts': _status_counts(project_id),
+        'columns': {
+            status: {
+                'tasks': [_serialize_task(task) for task in column['tasks']],
+                'next_cursor': column['next_cursor'],
+            }
+            for status, column in columns.items()
+        },
+    }
+    return JsonResponse(data)
+
+
+@login_required
+@project_access_required(role='creator', project_kwarg='project_id')
 def create_task(request, project_id):
-    project = Project.objects.get_or_404(id=project_id)
-    if project.created_by != request.user:
-        raise PermissionDenied("You do not have permission to create tasks in this project.")
-    
+    project = get_object_or_404(Project, pk=project_id)
+
     if request.method == 'POST':
         form = TaskForm(request.POST, project=project)
         if form.is_valid():
             task = form.save(commit=False)
             task.project = project
+            task.created_by = request.user
             task.save()
             form.save_m2m()
-            return redirect('project:project_detail', pk=project_id)
-        
+            return redirect('task:task_board', project_id=project_id)
+
     else:
         form = TaskForm(project=project)
-    
+
     context = {
         "form": form,
         "project": project
     }
-        
+
     return render(request, 'tasks/create_task.html', context)
 
+
+@login_required
+@project_access_required(role='creator', project_kwarg='project_id')
+def import_tasks_view(request, project_id):
+    """
+    View to bulk import tasks from an uploaded CSV file, with an optional dry run.
+    """
+    project = get_object_or_404(Project, pk=project_id)
+    result = None
+
+    if request.method == 'POST':
+        form = TaskImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            result = import_tasks(
+                project, form.cleaned_data['csv_file'], request.user,
+                dry_run=form.cleaned_data['dry_run']
+            )
+            result['dry_run'] = form.cleaned_data['dry_run']
+    else:
+        form = TaskImportForm()
+
+    context = {
+        'form': form,
+        'project': project,
+        'result': result,
+    }
+    return render(request, 'tasks/import_tasks.html', context)
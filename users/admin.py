@@ -27,7 +27,6 @@ class UserAdmin(BaseUserAdmin):
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (_('Personal Info'), {'fields': ('first_name', 'last_name')}),
-        (_('Security'), {'fields': ('otp',)}),
         (_('Permissions'), {
             'fields': ('is_active', 'is_staff', 'is_superuser', 
                       'groups', 'user_permissions'),
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'auth:user:{user_id}'
+
+
+def _cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id=user_id)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps the users it loads for AuthenticationMiddleware in the
+    Django cache for AUTH_USER_CACHE_TIMEOUT seconds, so a logged-in request no
+    longer reads the users table. Saving or deleting a user drops the entry
+    (users.signals); queryset.update() does not, so use save() for changes that
+    must reach logged-in users straight away.
+    """
+
+    def get_user(self, user_id):
+        key = _cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_cache_key(user_id))
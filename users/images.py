@@ -0,0 +1,103 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from project.models import Project
+
+# The UserImage fields written by process_user_image
+PIPELINE_FIELDS = ['image', 'thumbnail', 'thumbnail_webp']
+
+
+def _encode(image, fmt, **options):
+    """
+    Encodes a Pillow image. No exif, icc_profile or comment options are passed,
+    so none of the upload's metadata (camera, GPS position...) is written.
+    """
+    out = io.BytesIO()
+    image.save(out, fmt, **options)
+    return ContentFile(out.getvalue())
+
+
+def _flatten(image):
+    """
+    JPEG has no alpha channel: transparent areas become white.
+    """
+    if image.mode != 'RGBA':
+        return image.convert('RGB')
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def process_user_image(user_image):
+    """
+    Runs a UserImage through the image pipeline:
+
+    - the upload is rotated upright, shrunk to at most AVATAR_MAX_DIMENSION pixels
+      a side and re-encoded (PNG if it has transparency, JPEG otherwise), which
+      drops its metadata;
+    - square AVATAR_THUMBNAIL_SIZE thumbnails are made in JPEG and WebP.
+
+    Saves the UserImage and returns it. Raises PIL.UnidentifiedImageError for
+    files that are not images.
+    """
+    with user_image.image.open('rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    max_dimension = settings.AVATAR_MAX_DIMENSION
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    old_names = [f.name for f in (user_image.image, user_image.thumbnail, user_image.thumbnail_webp) if f]
+    stem = os.path.splitext(os.path.basename(user_image.image.name))[0]
+    if has_alpha:
+        user_image.image.save(f'{stem}.png', _encode(image, 'PNG', optimize=True), save=False)
+    else:
+        user_image.image.save(
+            f'{stem}.jpg', _encode(image, 'JPEG', quality=settings.AVATAR_JPEG_QUALITY, optimize=True), save=False
+        )
+
+    size = settings.AVATAR_THUMBNAIL_SIZE
+    thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    user_image.thumbnail.save(
+        f'{stem}-{size}.jpg',
+        _encode(_flatten(thumbnail), 'JPEG', quality=settings.AVATAR_JPEG_QUALITY, optimize=True),
+        save=False,
+    )
+    user_image.thumbnail_webp.save(
+        f'{stem}-{size}.webp', _encode(thumbnail, 'WEBP', quality=settings.AVATAR_JPEG_QUALITY, method=6),
+        save=False,
+    )
+    user_image._processed_image = user_image.image.name
+    user_image.save(update_fields=PIPELINE_FIELDS)
+
+    # The storage picked new names, so the raw upload and any earlier renditions go.
+    new_names = {user_image.image.name, user_image.thumbnail.name, user_image.thumbnail_webp.name}
+    for name in old_names:
+        if name not in new_names:
+            user_image.image.storage.delete(name)
+    return user_image
+
+
+def refresh_avatar(user):
+    """
+    Points the user's avatar at the thumbnails of their latest processed image,
+    or clears it when there is none. A change bumps the version of every project
+    the user is a member of.
+    """
+    latest = user.userimage_set.exclude(thumbnail='').order_by('-created_at', '-pk').first()
+    avatar = latest.thumbnail.name if latest else ''
+    avatar_webp = latest.thumbnail_webp.name if latest else ''
+    if (user.avatar, user.avatar_webp) != (avatar, avatar_webp):
+        user.avatar, user.avatar_webp = avatar, avatar_webp
+        # save() rather than update(), so the cached session user is dropped too
+        user.save(update_fields=['avatar', 'avatar_webp'])
+        # Member lists embed avatars in fragments cached by project version, and
+        # the old thumbnail files may be gone already.
+        Project.bump_versions(user.project_memberships.values('project_id'))
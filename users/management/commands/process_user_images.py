@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from users.images import process_user_image
+from users.models import UserImage
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs profile images through the image pipeline (metadata stripped, size capped, '
+        'JPEG and WebP thumbnails) and updates the users\' avatars. Only images without '
+        'thumbnails unless --all is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Also redo processed images, e.g. after changing AVATAR_THUMBNAIL_SIZE.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        images = UserImage.objects.select_related('user').order_by('pk')
+        if not options['all']:
+            images = images.filter(thumbnail='')
+
+        processed = failed = 0
+        for user_image in images.iterator(chunk_size=options['chunk_size']):
+            try:
+                process_user_image(user_image)
+            except OSError as e:
+                # Missing files and files Pillow can not read
+                failed += 1
+                self.stderr.write(self.style.WARNING(f"Skipped image {user_image.pk}: {e}"))
+                continue
+            processed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} image(s), {failed} failed."))
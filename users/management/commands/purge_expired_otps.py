@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.otp import purge_expired_otps
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired one-time passwords from the fallback table.'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_otps()
+        self.stdout.write(f"Deleted {deleted} expired code(s).")
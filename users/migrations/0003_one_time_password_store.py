@@ -0,0 +1,62 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:16
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+
+def copy_pending_otps(apps, schema_editor):
+    """
+    Moves codes that are still outstanding into the new table, hashed the same way
+    as users.otp, so emails already sent keep working after the deploy.
+    """
+    User = apps.get_model('users', 'User')
+    OneTimePassword = apps.get_model('users', 'OneTimePassword')
+    now = timezone.now()
+
+    rows = []
+    for email, otp, created_at, is_active in User.objects.filter(otp__isnull=False).values_list(
+        'email', 'otp', 'otp_created_at', 'is_active'
+    ).iterator():
+        email = email.strip().lower()
+        purpose = 'reset' if is_active else 'verify'
+        expires_at = (created_at or now) + timedelta(hours=1)
+        if expires_at <= now:
+            continue
+        code_hash = salted_hmac('users.otp', f'{purpose}:{email}:{otp}', algorithm='sha256').hexdigest()
+        rows.append(OneTimePassword(email=email, purpose=purpose, code_hash=code_hash, expires_at=expires_at))
+    OneTimePassword.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_otp_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OneTimePassword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('purpose', models.CharField(choices=[('verify', 'Email verification'), ('reset', 'Password reset')], max_length=10)),
+                ('code_hash', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'unique_together': {('email', 'purpose')},
+            },
+        ),
+        migrations.RunPython(copy_pending_otps, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='otp',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='otp_created_at',
+        ),
+    ]
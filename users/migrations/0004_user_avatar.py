@@ -0,0 +1,33 @@
+# Generated by Django 4.2.21 on 2026-10-18 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_one_time_password_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_webp',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='userimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='user_images/thumbnails/'),
+        ),
+        migrations.AddField(
+            model_name='userimage',
+            name='thumbnail_webp',
+            field=models.ImageField(blank=True, editable=False, upload_to='user_images/thumbnails/'),
+        ),
+    ]
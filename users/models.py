@@ -1,9 +1,9 @@
-from datetime import timedelta
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -57,8 +57,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
     is_active = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False) 
-    otp = models.IntegerField(null=True, blank=True)
-    otp_created_at = models.DateTimeField(null=True, blank=True)
+    # Storage names of the current avatar thumbnails, copied from the latest
+    # processed UserImage so rendering an avatar needs no query (see users.images)
+    avatar = models.CharField(max_length=255, blank=True, editable=False)
+    avatar_webp = models.CharField(max_length=255, blank=True, editable=False)
     
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
@@ -77,10 +79,19 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     def user_image(self):
         """
-        Returns the user's profile image if it exists
+        Returns the user's latest profile image if it exists. Costs a query; use
+        avatar_url to render the avatar.
         """
-        picture = UserImage.objects.filter(user=self).first()
+        picture = UserImage.objects.filter(user=self).order_by('-created_at', '-pk').first()
         return picture.image if picture else None
+
+    @property
+    def avatar_url(self):
+        return default_storage.url(self.avatar) if self.avatar else ''
+
+    @property
+    def avatar_webp_url(self):
+        return default_storage.url(self.avatar_webp) if self.avatar_webp else ''
     
     def get_full_name(self):
         """
@@ -94,17 +105,47 @@ class User(AbstractBaseUser, PermissionsMixin):
         """
         return self.first_name
     
-    def is_otp_expired(self):
-        """Check if OTP is older than 1 hour"""
-        if self.otp_created_at:
-            return timezone.now() > self.otp_created_at + timedelta(hours=1)
-        return True
-    
     def __str__(self):
         return f"{self.get_full_name()} ({self.email})"
     
 class UserImage(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     image = models.ImageField(upload_to='user_images/')
+    # Square avatar renditions made by users.images; empty until processed
+    thumbnail = models.ImageField(upload_to='user_images/thumbnails/', blank=True, editable=False)
+    thumbnail_webp = models.ImageField(upload_to='user_images/thumbnails/', blank=True, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
-    
\ No newline at end of file
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._processed_image = instance.__dict__.get('image')
+        return instance
+
+    def needs_processing(self):
+        """
+        True for a new upload: one not run through users.images yet.
+        """
+        return self.image.name != getattr(self, '_processed_image', None)
+    
+
+class OneTimePassword(models.Model):
+    """
+    Durable copy of an issued OTP, read when the cache entry is missing.
+    Only a keyed hash of the code is stored; see users.otp.
+    """
+    PURPOSE_CHOICES = [
+        ('verify', 'Email verification'),
+        ('reset', 'Password reset'),
+    ]
+
+    email = models.EmailField()
+    purpose = models.CharField(max_length=10, choices=PURPOSE_CHOICES)
+    code_hash = models.CharField(max_length=64)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('email', 'purpose')
+
+    def __str__(self):
+        return f"{self.get_purpose_display()} code for {self.email}"
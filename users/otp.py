@@ -0,0 +1,99 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import OneTimePassword
+
+
+def _normalize(email):
+    return email.strip().lower()
+
+
+def _cache_key(email, purpose):
+    return f"otp:{purpose}:{hashlib.sha1(email.encode()).hexdigest()}"
+
+
+def _hash_code(email, purpose, code):
+    return salted_hmac('users.otp', f'{purpose}:{email}:{code}', algorithm='sha256').hexdigest()
+
+
+UPSERT = {
+    'update_conflicts': True,
+    'unique_fields': ['email', 'purpose'],
+    'update_fields': ['code_hash', 'expires_at'],
+}
+
+
+def _new_code(email, purpose):
+    """
+    Returns a fresh 6-digit code and the OneTimePassword row that stores its hash.
+    """
+    code = f'{secrets.randbelow(900000) + 100000}'
+    row = OneTimePassword(
+        email=email,
+        purpose=purpose,
+        code_hash=_hash_code(email, purpose, code),
+        expires_at=timezone.now() + timedelta(seconds=settings.OTP_TTL_SECONDS),
+    )
+    return code, row
+
+
+def issue_otp(email, purpose):
+    """
+    Generates a 6-digit code for (email, purpose), replacing any earlier one, and
+    returns it. The code is stored hashed, in the cache with a TTL and in the
+    OneTimePassword table as a fallback for when the cache entry is lost.
+    """
+    email = _normalize(email)
+    code, row = _new_code(email, purpose)
+    OneTimePassword.objects.bulk_create([row], **UPSERT)
+    cache.set(_cache_key(email, purpose), row.code_hash, timeout=settings.OTP_TTL_SECONDS)
+    return code
+
+
+async def aissue_otp(email, purpose):
+    """
+    Async version of issue_otp for async views.
+    """
+    email = _normalize(email)
+    code, row = _new_code(email, purpose)
+    await OneTimePassword.objects.abulk_create([row], **UPSERT)
+    await cache.aset(_cache_key(email, purpose), row.code_hash, timeout=settings.OTP_TTL_SECONDS)
+    return code
+
+
+def verify_otp(email, purpose, code):
+    """
+    Returns True if `code` is the live code for (email, purpose) and consumes it,
+    so each code can be used only once. Expired and unknown codes return False.
+
+    A wrong code is rejected from the cache alone; the table is only read when the
+    cache has no entry, and only written when a code is consumed.
+    """
+    email = _normalize(email)
+    code_hash = _hash_code(email, purpose, code)
+    cached_hash = cache.get(_cache_key(email, purpose))
+    if cached_hash is not None and not constant_time_compare(cached_hash, code_hash):
+        return False
+
+    # Deleting the matching row is what makes the code single use: of two
+    # concurrent requests with the same code, only one deletes it.
+    consumed, _ = OneTimePassword.objects.filter(
+        email=email, purpose=purpose, code_hash=code_hash, expires_at__gt=timezone.now()
+    ).delete()
+    if consumed:
+        cache.delete(_cache_key(email, purpose))
+    return bool(consumed)
+
+
+def purge_expired_otps():
+    """
+    Deletes expired rows from the fallback table. Returns the number deleted.
+    """
+    deleted, _ = OneTimePassword.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_cached_user
+from .images import process_user_image, refresh_avatar
+from .models import UserImage
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_cached_user(instance.pk)
+    else:
+        # Changed from the group or permission side: pk_set holds user ids,
+        # except for clear(), which does not say whose rows went.
+        for user_id in pk_set or ():
+            invalidate_cached_user(user_id)
+
+
+@receiver(post_save, sender=UserImage)
+def user_image_saved(sender, instance, **kwargs):
+    if instance.needs_processing():
+        # Saves the image again, which comes back here with nothing left to process.
+        process_user_image(instance)
+        return
+    refresh_avatar(instance.user)
+
+
+@receiver(post_delete, sender=UserImage)
+def user_image_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, User):
+        # The user is being deleted along with their images.
+        return
+    refresh_avatar(instance.user)
@@ -1,3 +1,386 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
 
-# Create your tests here.
+from PIL import Image
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from project.models import Project, ProjectMember
+from django.urls import reverse
+from django.utils import timezone
+
+from core.ratelimit import hit
+from .backends import CachedModelBackend
+from .models import OneTimePassword, User, UserImage
+from .otp import issue_otp, purge_expired_otps, verify_otp
+
+
+class UserViewQueryCountTests(TestCase):
+    """
+    Pins the number of queries each account view runs so N+1 regressions fail CI.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'jane@example.com', 'correct-horse', first_name='Jane', last_name='Doe', is_active=True
+        )
+        cls.pending = User.objects.create_user(
+            'new@example.com', 'correct-horse', first_name='New', last_name='User'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.verify_code = issue_otp('new@example.com', 'verify')
+
+    def test_register_get(self):
+        with self.assertNumQueries(0):
+            self.client.get(reverse('accounts:register'))
+
+    def test_register_post(self):
+        with self.assertNumQueries(4):
+            response = self.client.post(reverse('accounts:register'), {
+                'first_name': 'Sam',
+                'last_name': 'Smith',
+                'email': 'sam@example.com',
+                'password': 'correct-horse',
+                'password_confirm': 'correct-horse',
+            })
+        self.assertEqual(response.status_code, 302)
+
+    def test_verify_email_get(self):
+        with self.assertNumQueries(0):
+            self.client.get(reverse('accounts:verify_email'))
+
+    def test_verify_email_post(self):
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse('accounts:verify_email'), {'email': 'new@example.com', 'otp': self.verify_code}
+            )
+        self.assertTemplateUsed(response, 'users/verification_success.html')
+
+    def test_login_get(self):
+        with self.assertNumQueries(0):
+            self.client.get(reverse('accounts:login'))
+
+    def test_login_post(self):
+        with self.assertNumQueries(9):
+            response = self.client.post(
+                reverse('accounts:login'), {'email': 'jane@example.com', 'password': 'correct-horse'}
+            )
+        self.assertRedirects(response, reverse('accounts:home'), fetch_redirect_response=False)
+
+    def test_logout(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('accounts:logout'))
+
+    def test_home(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('accounts:home'))
+
+    def test_forgot_password_request_post(self):
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                reverse('accounts:forgot_password_request'), {'email': 'jane@example.com'}
+            )
+        self.assertTemplateUsed(response, 'users/forgot_password_email_sent.html')
+
+    def test_forgot_password_verify_post(self):
+        code = issue_otp('jane@example.com', 'reset')
+        with self.assertNumQueries(5):
+            response = self.client.post(
+                reverse('accounts:forgot_password_verify'), {'email': 'jane@example.com', 'otp': code}
+            )
+        self.assertRedirects(response, reverse('accounts:forgot_password_reset'), fetch_redirect_response=False)
+
+    def test_forgot_password_reset_post(self):
+        session = self.client.session
+        session['reset_email'] = 'jane@example.com'
+        session.save()
+        with self.assertNumQueries(13):
+            response = self.client.post(reverse('accounts:forgot_password_reset'), {
+                'new_password': 'battery-staple',
+                'confirm_new_password': 'battery-staple',
+            })
+        self.assertTemplateUsed(response, 'users/forgot_password_success.html')
+
+    async def test_forgot_password_request_under_asgi(self):
+        response = await self.async_client.post(
+            reverse('accounts:forgot_password_request'), {'email': 'jane@example.com'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(await OneTimePassword.objects.filter(email='jane@example.com', purpose='reset').aexists())
+
+
+class AsyncAccountViewTests(TestCase):
+    """
+    The async account views render base.html, which reads request.user.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'jane@example.com', 'correct-horse', first_name='Jane', last_name='Doe', is_active=True
+        )
+
+    def test_pages_load_for_logged_in_visitor(self):
+        for name in ('accounts:register', 'accounts:forgot_password_request'):
+            with self.subTest(name=name):
+                self.client.force_login(self.user)
+                cache.clear()
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+
+    async def test_pages_load_for_logged_in_visitor_under_asgi(self):
+        for name in ('accounts:register', 'accounts:forgot_password_request'):
+            with self.subTest(name=name):
+                await sync_to_async(self.async_client.force_login)(self.user)
+                await sync_to_async(cache.clear)()
+                response = await self.async_client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'jane@example.com', 'correct-horse', first_name='Jane', last_name='Doe', is_active=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.backend = CachedModelBackend()
+
+    def test_user_is_cached(self):
+        self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_save_drops_cached_user(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = 'Janet'
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Janet')
+
+    def test_inactive_user_is_rejected(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_logged_in_request_skips_session_and_user_tables(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('project:project_create'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('project:project_create'))
+        self.assertEqual(response.status_code, 200)
+
+
+def make_upload(size=(3000, 2000), fmt='JPEG', mode='RGB', name='photo.jpg'):
+    image = Image.new(mode, size, 'red')
+    exif = Image.Exif()
+    exif[0x010f] = 'Camera maker'  # Make
+    out = io.BytesIO()
+    image.save(out, fmt, exif=exif)
+    return SimpleUploadedFile(name, out.getvalue())
+
+
+@override_settings(AVATAR_MAX_DIMENSION=1024, AVATAR_THUMBNAIL_SIZE=128)
+class ProfileImageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'jane@example.com', 'correct-horse', first_name='Jane', last_name='Doe', is_active=True
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_upload_is_processed(self):
+        user_image = UserImage.objects.create(user=self.user, image=make_upload())
+        with Image.open(user_image.image.path) as original:
+            self.assertEqual(original.size, (1024, 683))
+            self.assertEqual(dict(original.getexif()), {})
+        with Image.open(user_image.thumbnail.path) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ('JPEG', (128, 128)))
+        with Image.open(user_image.thumbnail_webp.path) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ('WEBP', (128, 128)))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar, user_image.thumbnail.name)
+        self.assertTrue(self.user.avatar_webp_url.endswith('.webp'))
+
+    def test_transparent_upload_stays_png(self):
+        user_image = UserImage.objects.create(
+            user=self.user, image=make_upload((200, 200), 'PNG', 'RGBA', 'logo.png')
+        )
+        self.assertTrue(user_image.image.name.endswith('.png'))
+        self.assertTrue(user_image.thumbnail.name.endswith('.jpg'))
+
+    def test_avatar_follows_latest_image(self):
+        first = UserImage.objects.create(user=self.user, image=make_upload((300, 300)))
+        second = UserImage.objects.create(user=self.user, image=make_upload((300, 300)))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar, second.thumbnail.name)
+
+        second.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar, first.thumbnail.name)
+
+    def test_member_list_avatars_need_no_queries(self):
+        UserImage.objects.create(user=self.user, image=make_upload((300, 300)))
+        project = Project.objects.create(name='Apollo', description='', created_by=self.user)
+        ProjectMember.objects.create(project=project, user=self.user, role='creator')
+        self.client.force_login(self.user)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('project:project_detail', args=[project.pk]))
+        self.assertContains(response, User.objects.get(pk=self.user.pk).avatar_url)
+
+    def test_new_avatar_shows_on_cached_member_list(self):
+        project = Project.objects.create(name='Apollo', description='', created_by=self.user)
+        ProjectMember.objects.create(project=project, user=self.user, role='creator')
+        self.client.force_login(self.user)
+        url = reverse('project:project_detail', args=[project.pk])
+        self.client.get(url)  # sets the CSRF cookie, which is part of the ETag
+        etag = self.client.get(url)['ETag']
+
+        UserImage.objects.create(user=self.user, image=make_upload((300, 300)))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, User.objects.get(pk=self.user.pk).avatar_url)
+
+    def test_backfill_command(self):
+        # bulk_create stores the file but sends no signals, like images uploaded before the pipeline
+        [user_image] = UserImage.objects.bulk_create([UserImage(user=self.user, image=make_upload((300, 300)))])
+        self.assertFalse(user_image.thumbnail)
+
+        out = io.StringIO()
+        call_command('process_user_images', stdout=out)
+        self.assertIn('Processed 1 image(s), 0 failed.', out.getvalue())
+        user_image.refresh_from_db()
+        self.assertTrue(user_image.thumbnail)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar, user_image.thumbnail.name)
+
+
+class OtpStoreTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_code_is_single_use(self):
+        code = issue_otp('jane@example.com', 'reset')
+        self.assertTrue(verify_otp('Jane@Example.com', 'reset', code))
+        self.assertFalse(verify_otp('jane@example.com', 'reset', code))
+
+    def test_code_is_stored_hashed_and_scoped_to_purpose(self):
+        code = issue_otp('jane@example.com', 'reset')
+        self.assertFalse(OneTimePassword.objects.filter(code_hash__contains=code).exists())
+        self.assertFalse(verify_otp('jane@example.com', 'verify', code))
+
+    def test_wrong_code_is_rejected_from_cache(self):
+        issue_otp('jane@example.com', 'reset')
+        with self.assertNumQueries(0):
+            self.assertFalse(verify_otp('jane@example.com', 'reset', '000000'))
+
+    def test_falls_back_to_table_when_cache_is_empty(self):
+        code = issue_otp('jane@example.com', 'reset')
+        cache.clear()
+        self.assertTrue(verify_otp('jane@example.com', 'reset', code))
+
+    def test_reissuing_replaces_the_previous_code(self):
+        old_code = issue_otp('jane@example.com', 'reset')
+        new_code = issue_otp('jane@example.com', 'reset')
+        if old_code != new_code:
+            self.assertFalse(verify_otp('jane@example.com', 'reset', old_code))
+        self.assertTrue(verify_otp('jane@example.com', 'reset', new_code))
+
+    @override_settings(OTP_TTL_SECONDS=60)
+    def test_expired_code_is_rejected_and_purged(self):
+        code = issue_otp('jane@example.com', 'reset')
+        cache.clear()
+        OneTimePassword.objects.update(expires_at=timezone.now())
+        self.assertFalse(verify_otp('jane@example.com', 'reset', code))
+        self.assertEqual(purge_expired_otps(), 1)
+
+
+@override_settings(RATELIMIT_RATES={'login': '3/m', 'otp': '2/m'}, RATELIMIT_LOCKOUT_SECONDS=600)
+class RateLimitTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'jane@example.com', 'correct-horse', first_name='Jane', last_name='Doe', is_active=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, email='jane@example.com', ip='10.0.0.1'):
+        return self.client.post(
+            reverse('accounts:login'), {'email': email, 'password': 'wrong'}, REMOTE_ADDR=ip
+        )
+
+    def test_login_locked_out_per_email_without_queries(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.login(ip='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        # Emails back off for the rest of the window only, not RATELIMIT_LOCKOUT_SECONDS.
+        self.assertLessEqual(int(response['Retry-After']), 60)
+
+    def test_successful_logins_do_not_count_against_email(self):
+        for i in range(5):
+            response = self.client.post(
+                reverse('accounts:login'), {'email': 'jane@example.com', 'password': 'correct-horse'},
+                REMOTE_ADDR=f'10.0.1.{i}',
+            )
+            self.assertEqual(response.status_code, 302)
+
+    @override_settings(RATELIMIT_TRUSTED_PROXY_HOPS=1)
+    def test_client_ip_behind_proxy(self):
+        def login(forwarded_for, n):
+            return self.client.post(
+                reverse('accounts:login'), {'email': f'user{n}@example.com', 'password': 'wrong'},
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=forwarded_for,
+            )
+
+        # Clients behind the same proxy are limited separately...
+        for i in range(5):
+            self.assertEqual(login(f'203.0.113.{i}', i).status_code, 200)
+        # ...and addresses the client prepends itself are ignored.
+        for i in range(3):
+            login(f'198.51.100.{i}, 203.0.113.50', i)
+        self.assertEqual(login('198.51.100.9, 203.0.113.50', 9).status_code, 429)
+
+    def test_login_locked_out_per_ip(self):
+        for i in range(3):
+            self.login(email=f'user{i}@example.com')
+        self.assertEqual(self.login(email='other@example.com').status_code, 429)
+        self.assertEqual(self.login(email='other@example.com', ip='10.0.0.2').status_code, 200)
+
+    def test_showing_the_form_is_not_counted(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(reverse('accounts:verify_email')).status_code, 200)
+
+    def test_verification_link_is_counted(self):
+        url = reverse('accounts:verify_email') + '?email=ghost@example.com&otp=000000'
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(self.client.get(url).status_code, 429)
+
+    def test_sliding_window_weights_previous_window(self):
+        for _ in range(4):
+            hit('test', 'key', limit=4, period=60, now=59)
+        # A quarter into the next window, 3/4 of the previous 4 attempts still count.
+        self.assertEqual(hit('test', 'key', limit=4, period=60, now=75), 0)
+        self.assertEqual(hit('test', 'key', limit=4, period=60, now=75), 46)
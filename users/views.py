@@ -3,33 +3,38 @@ from django.http import HttpResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout, authenticate
 from django.urls import reverse
-from django.core.mail import send_mail
 from django.conf import settings
-import random
 from django.contrib import messages
 from .forms import ForgotPasswordRequestForm, OtpVerificationForm, SetNewPasswordForm, UserRegistrationForm, UserLoginForm
 from .models import User
+from .otp import aissue_otp, verify_otp
+from asgiref.sync import sync_to_async
+from core.auth import aget_user
+from core.ratelimit import ratelimit, record_failure
+from mailer.services import aenqueue_mail
 import logging
 
 logger = logging.getLogger(__name__)
 
-def register_view(request):
+async def register_view(request):
     """
     View for user registration.
     Handles displaying the registration form and processing submissions.
     Sends a verification email upon successful registration.
+    Validation (a unique email lookup) and saving (password hashing) run in a
+    thread; the rest uses the async ORM.
     """
+    # base.html reads request.user, whose first access queries the database.
+    request.user = await aget_user(request)
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
-        if form.is_valid():
-            user = form.save(commit=False)
-
-            # Generate and save OTP
-            otp = random.randint(100000, 999999)
-            user.otp = otp
-            user.otp_created_at = timezone.now()
+        if await sync_to_async(form.is_valid)():
+            # The form's save() creates the user with a hashed password.
+            user = await sync_to_async(form.save)()
             logger.info("user created successfully")
-            user.save()
+
+            # Generate and store OTP
+            otp = await aissue_otp(user.email, 'verify')
 
             # Send Verification Email
             subject = 'Verify Your Email Address'
@@ -53,13 +58,12 @@ def register_view(request):
             recipient_list = [user.email]
 
             try:
-                send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-                logger.info("Email sent successfully")
-                verify_form = OtpVerificationForm(initial={'email': user.email})
+                await aenqueue_mail(subject, message, from_email, recipient_list)
+                logger.info("Verification email queued")
                 return redirect(reverse('accounts:verify_email') + f'?email={user.email}')
             except Exception as e:
-                print(f"Error sending email: {e}")
-                user.delete()
+                logger.error(f"Error queueing email: {e}")
+                await user.adelete()
                 return render(request, 'users/register.html', {
                     'form': form, 
                     'error': 'Failed to send verification email. Please try again.'
@@ -70,10 +74,11 @@ def register_view(request):
     return render(request, 'users/register.html', {'form': form})
 
 
+@ratelimit('otp')
 def verify_email_view(request):
     """
     View for verifying user's email using an OTP form.
-    Checks if OTP is expired (older than 1 hour).
+    Codes expire on their own after settings.OTP_TTL_SECONDS and can be used once.
     """
     error_message = None
     form = None
@@ -86,75 +91,45 @@ def verify_email_view(request):
             email = form.cleaned_data['email']
             otp = form.cleaned_data['otp']
             try:
-                user = User.objects.get(email=email)
+                # Check if OTP matches; expired codes are no longer in the store
+                if verify_otp(email, 'verify', otp):
+                    User.objects.filter(email__iexact=email).update(is_active=True, updated_at=timezone.now())
+                    return render(request, 'users/verification_success.html')
 
                 # Check if user is already active
-                if user.is_active:
+                if User.objects.filter(email__iexact=email, is_active=True).exists():
                     return render(request, 'users/verification_failed.html', 
                                {'error': 'Your account is already active. Please log in.'})
 
-                # Check if OTP is expired
-                if user.is_otp_expired():
-                    user.otp = None
-                    user.otp_created_at = None
-                    user.save()
-                    error_message = 'Verification code has expired. Please request a new one.'
-                    form.add_error(None, error_message)
-                # Check if OTP matches and is not None
-                elif user.otp is not None and str(user.otp) == otp:
-                    user.is_active = True
-                    user.otp = None
-                    user.otp_created_at = None
-                    user.save()
-                    return render(request, 'users/verification_success.html')
-                else:
-                    error_message = 'Invalid email or verification code.'
-                    form.add_error(None, error_message)
-
-            except User.DoesNotExist:
-                error_message = 'Invalid email or verification code.'
+                record_failure(request)
+                error_message = 'Invalid or expired verification code. Please request a new one.'
                 form.add_error(None, error_message)
 
             except Exception as e:
-                print(f"Verification error: {e}")
+                logger.exception(f"Verification error: {e}")
                 error_message = 'An unexpected error occurred during verification.'
                 form.add_error(None, error_message)
 
     elif email_from_get and otp_from_get:
         # Handle GET request with email and otp (from the email link)
         try:
-            user = User.objects.get(email=email_from_get)
+            # Check if OTP matches; expired codes are no longer in the store
+            if verify_otp(email_from_get, 'verify', otp_from_get):
+                User.objects.filter(email__iexact=email_from_get).update(is_active=True, updated_at=timezone.now())
+                return render(request, 'users/verification_success.html')
 
             # Check if user is already active
-            if user.is_active:
+            if User.objects.filter(email__iexact=email_from_get, is_active=True).exists():
                 return render(request, 'users/verification_failed.html', 
                            {'error': 'Your account is already active. Please log in.'})
 
-            # Check if OTP is expired
-            if user.is_otp_expired():
-                user.otp = None
-                user.otp_created_at = None
-                user.save()
-                error_message = 'Verification code has expired. Please request a new one.'
-                form = OtpVerificationForm(initial={'email': email_from_get})
-            # Check if OTP matches and is not None
-            elif user.otp is not None and str(user.otp) == otp_from_get:
-                user.is_active = True
-                user.otp = None
-                user.otp_created_at = None
-                user.save()
-                return render(request, 'users/verification_success.html')
-            else:
-                # Invalid OTP from GET parameters
-                error_message = 'Invalid verification code.'
-                form = OtpVerificationForm(initial={'email': email_from_get})
-
-        except User.DoesNotExist:
-            error_message = 'User not found.'
-            form = OtpVerificationForm()
+            # Invalid OTP from GET parameters
+            record_failure(request)
+            error_message = 'Invalid or expired verification code. Please request a new one.'
+            form = OtpVerificationForm(initial={'email': email_from_get})
 
         except Exception as e:
-            print(f"Verification error: {e}")
+            logger.exception(f"Verification error: {e}")
             error_message = 'An unexpected error occurred during verification.'
             form = OtpVerificationForm()
 
@@ -164,6 +139,7 @@ def verify_email_view(request):
     return render(request, 'users/verify_email.html', {'form': form, 'error': error_message})
 
 
+@ratelimit('login')
 def login_view(request):
     """
     View for user login.
@@ -184,7 +160,7 @@ def login_view(request):
                     # Check if there's an invitation token stored in the session
                     invitation_token = request.session.pop('invitation_token', None)
                     if invitation_token:
-                        return redirect(reverse('accept_project_invite', args=[invitation_token]))
+                        return redirect(reverse('project:accept_project_invite', args=[invitation_token]))
 
                     # If no invitation token, redirect to the home page
                     return redirect('accounts:home')
@@ -196,6 +172,9 @@ def login_view(request):
             else:
                  form.add_error(None, "Invalid email or password.")
                  messages.error(request, "Invalid email or password.")
+        else:
+            # Wrong credentials fail the form's validation
+            record_failure(request)
     else:
         form = UserLoginForm()
 
@@ -215,22 +194,24 @@ def logout_view(request):
     return redirect('accounts:login')
 
 
-def forgot_password_request_view(request):
+@ratelimit('otp')
+async def forgot_password_request_view(request):
     """
     View for handling forgot password requests.
     Sends an email with a password reset OTP.
     """
+    request.user = await aget_user(request)
     if request.method == 'POST':
         form = ForgotPasswordRequestForm(request.POST)
         if form.is_valid():
             email = form.cleaned_data['email']
+            # Every request may send a mail, so each one counts against the address.
+            await sync_to_async(record_failure)(request)
             try:
-                user = User.objects.get(email=email)
-                
-                # Generate and save OTP
-                otp = random.randint(100000, 999999)
-                user.otp = otp
-                user.save()
+                user = await User.objects.aget(email=email)
+
+                # Generate and store OTP
+                otp = await aissue_otp(user.email, 'reset')
 
                 # Send password reset email
                 subject = 'Password Reset Request'
@@ -242,7 +223,7 @@ def forgot_password_request_view(request):
 
                 Your OTP: {otp}
 
-                Verification Link: {request.build_absolute_uri(reverse('forgot_password_verify') + f'?email={user.email}&otp={otp}')}
+                Verification Link: {request.build_absolute_uri(reverse('accounts:forgot_password_verify') + f'?email={user.email}&otp={otp}')}
 
                 If you did not request a password reset, please ignore this email.
 
@@ -252,10 +233,10 @@ def forgot_password_request_view(request):
                 recipient_list = [user.email]
 
                 try:
-                    send_mail(subject, message, from_email, recipient_list, fail_silently=False)
+                    await aenqueue_mail(subject, message, from_email, recipient_list)
                     return render(request, 'users/forgot_password_email_sent.html', {'email': user.email})
                 except Exception as e:
-                    print(f"Error sending email: {e}")
+                    logger.error(f"Error queueing email: {e}")
                     return render(request, 'users/forgot_password.html', 
                                  {'form': form, 'error': 'Failed to send email. Please try again.'})
             except User.DoesNotExist:
@@ -266,6 +247,7 @@ def forgot_password_request_view(request):
     return render(request, 'users/forgot_password.html', {'form': form})
 
 
+@ratelimit('otp')
 def forgot_password_verify_view(request):
     """
     View for verifying OTP during password reset process.
@@ -280,54 +262,27 @@ def forgot_password_verify_view(request):
         if form.is_valid():
             email = form.cleaned_data['email']
             otp = form.cleaned_data['otp']
-            try:
-                user = User.objects.get(email=email)
-
-                # Check if OTP matches and is not None
-                if user.otp is not None and str(user.otp) == otp:
-                    # Store email in session for the next step
-                    request.session['reset_email'] = email
-                    user.otp = None 
-                    user.save()
-                    return redirect('forgot_password_reset')
-                else:
-                    error_message = 'Invalid email or verification code.'
-                    form.add_error(None, error_message)
-
-            except User.DoesNotExist:
+            # Check if OTP matches; it is consumed on success
+            if verify_otp(email, 'reset', otp):
+                # Store email in session for the next step
+                request.session['reset_email'] = email
+                return redirect('accounts:forgot_password_reset')
+            else:
+                record_failure(request)
                 error_message = 'Invalid email or verification code.'
                 form.add_error(None, error_message)
 
-            except Exception as e:
-                print(f"Verification error: {e}")
-                error_message = 'An unexpected error occurred during verification.'
-                form.add_error(None, error_message)
-
     elif email_from_get and otp_from_get:
         # Handle GET request with email and otp (from the email link)
-        try:
-            user = User.objects.get(email=email_from_get)
-
-            # Check if OTP matches and is not None
-            if user.otp is not None and str(user.otp) == otp_from_get:
-                # Store email in session for the next step
-                request.session['reset_email'] = email_from_get
-                user.otp = None
-                user.save()
-                return redirect('forgot_password_reset')
-            else:
-                # Invalid OTP from GET parameters
-                error_message = 'Invalid verification code.'
-                form = OtpVerificationForm(initial={'email': email_from_get})
-
-        except User.DoesNotExist:
-            error_message = 'User not found.'
-            form = OtpVerificationForm()
-
-        except Exception as e:
-            print(f"Verification error: {e}")
-            error_message = 'An unexpected error occurred during verification.'
-            form = OtpVerificationForm()
+        if verify_otp(email_from_get, 'reset', otp_from_get):
+            # Store email in session for the next step
+            request.session['reset_email'] = email_from_get
+            return redirect('accounts:forgot_password_reset')
+        else:
+            # Invalid OTP from GET parameters
+            record_failure(request)
+            error_message = 'Invalid verification code.'
+            form = OtpVerificationForm(initial={'email': email_from_get})
 
     else:
         form = OtpVerificationForm()
@@ -342,7 +297,7 @@ def forgot_password_reset_view(request):
     """
     # Check if user came from verification step
     if 'reset_email' not in request.session:
-        return redirect('forgot_password_request')
+        return redirect('accounts:forgot_password_request')
 
     if request.method == 'POST':
         form = SetNewPasswordForm(request.POST)
@@ -365,7 +320,7 @@ def forgot_password_reset_view(request):
             except User.DoesNotExist:
                 form.add_error(None, 'User not found. Please try the password reset process again.')
             except Exception as e:
-                print(f"Password reset error: {e}")
+                logger.exception(f"Password reset error: {e}")
                 form.add_error(None, 'An error occurred. Please try again.')
     else:
         form = SetNewPasswordForm()